@@ -0,0 +1,18 @@
+"""
+HTTP connection pools shared by every API client in the process.
+
+OpenAI and ElevenLabs requests go through the same pools, so each turn reuses
+warm HTTP/2 connections instead of paying a new TCP + TLS handshake.
+"""
+
+import httpx
+from openai import DefaultHttpxClient, DefaultAsyncHttpxClient
+
+
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=16, keepalive_expiry=60.0)
+
+# Sync pool: ElevenLabs TTS
+HTTP_CLIENT = DefaultHttpxClient(http2=True, limits=HTTP_LIMITS, timeout=30.0)
+
+# Async pool: AsyncOpenAI on the NLU event loop
+ASYNC_HTTP_CLIENT = DefaultAsyncHttpxClient(http2=True, limits=HTTP_LIMITS, timeout=10.0)
@@ -0,0 +1,130 @@
+"""
+Local emergency detection with a small quantized text classifier.
+
+Runs a distilled "emergency vs normal" model (DistilBERT/MiniLM, ONNX int8)
+next to the OpenAI call, so obvious emergencies are caught in milliseconds
+without waiting on the LLM. Optional: if onnxruntime, tokenizers or the
+model files are missing, the NLU works exactly as before.
+
+Export a fine-tuned checkpoint with:
+    python src/core/emergency_classifier.py <checkpoint> models/emergency-classifier
+"""
+
+import os
+import sys
+from typing import Optional
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+except ImportError:
+    ort = None
+    Tokenizer = None
+
+
+DEFAULT_MODEL_DIR = "models/emergency-classifier"
+MODEL_FILE = "model_quantized.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+class EmergencyClassifier:
+    """
+    Binary emergency classifier backed by an int8 ONNX Runtime session.
+    """
+
+    def __init__(self, model_dir: str, max_length: int = 128):
+        """
+        Load the quantized model and its tokenizer.
+
+        Args:
+            model_dir: Directory containing model_quantized.onnx and tokenizer.json
+            max_length: Maximum number of tokens fed to the model
+        """
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = 1  # Single utterances; avoid thread spin-up cost
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, MODEL_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def predict(self, text: str) -> float:
+        """
+        Score an utterance.
+
+        Args:
+            text: Transcribed caller text
+
+        Returns:
+            Probability (0-1) that the caller is reporting an emergency
+        """
+        encoding = self.tokenizer.encode(text)
+        feeds = {
+            "input_ids": np.array([encoding.ids], dtype=np.int64),
+            "attention_mask": np.array([encoding.attention_mask], dtype=np.int64),
+        }
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array([encoding.type_ids], dtype=np.int64)
+        logits = self.session.run(None, feeds)[0][0]
+        exp = np.exp(logits - logits.max())
+        return float(exp[1] / exp.sum())
+
+
+def load_emergency_classifier(model_dir: Optional[str] = None) -> Optional[EmergencyClassifier]:
+    """
+    Load the classifier if its runtime and model files are available.
+
+    Args:
+        model_dir: Model directory (default: EMERGENCY_MODEL_DIR env var or models/emergency-classifier)
+
+    Returns:
+        EmergencyClassifier, or None when local detection is unavailable
+    """
+    model_dir = model_dir or os.getenv("EMERGENCY_MODEL_DIR", DEFAULT_MODEL_DIR)
+    if ort is None or Tokenizer is None:
+        return None
+    if not os.path.exists(os.path.join(model_dir, MODEL_FILE)):
+        return None
+    try:
+        classifier = EmergencyClassifier(model_dir)
+        print(f"[EMERGENCY] Local classifier loaded from {model_dir}")
+        return classifier
+    except Exception as e:
+        print(f"[EMERGENCY] Failed to load local classifier: {e}")
+        return None
+
+
+def export_quantized_model(checkpoint: str, output_dir: str):
+    """
+    Export a fine-tuned sequence classification checkpoint to ONNX and quantize it to int8.
+    Needs the export-only extras: optimum[onnxruntime] and transformers.
+
+    Args:
+        checkpoint: Hugging Face model id or local checkpoint (label 1 = emergency)
+        output_dir: Where to write model_quantized.onnx and tokenizer.json
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from transformers import AutoTokenizer
+
+    model = ORTModelForSequenceClassification.from_pretrained(checkpoint, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(checkpoint).save_pretrained(output_dir)
+    quantize_dynamic(
+        os.path.join(output_dir, "model.onnx"),
+        os.path.join(output_dir, MODEL_FILE),
+        weight_type=QuantType.QInt8
+    )
+    print(f"[EMERGENCY] Quantized model written to {output_dir}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python emergency_classifier.py <checkpoint> <output_dir>")
+        sys.exit(1)
+    export_quantized_model(sys.argv[1], sys.argv[2])
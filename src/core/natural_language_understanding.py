@@ -8,18 +8,152 @@ This module processes speech transcriptions in real-time, performing:
 4. All in a single OpenAI API call for efficiency
 """
 
-import json
-from openai import OpenAI
+import orjson
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple, Coroutine, Callable, Deque, Literal
 from enum import Enum
-import requests
-from requests.exceptions import RequestException
+from datetime import date
+from dataclasses import dataclass, fields
+from pydantic import BaseModel, ConfigDict, Field
+import numpy as np
+import tiktoken
 import re
+from core.emergency_classifier import load_emergency_classifier
+from core._clients import ASYNC_HTTP_CLIENT
 
 load_dotenv()
 
+EMERGENCY_TRANSFER_RESPONSE = "I understand this is urgent. I'm connecting you with the emergency team who can better assist you. Please hold in line!"
+HIGH_FRUSTRATION_RESPONSE = "I can understand that there is a bit of frustration. Let me connect you with a specialist who can better help you right away. Please hold."
+TECHNICAL_ERROR_RESPONSE = "I apologize, I'm having technical difficulties. Let me connect you with an agent."
+GREETING_RESPONSE = "Hello! Thank you for calling InsurTech. How may I assist you today?"
+
+# Fixed responses whose audio can be rendered once and replayed.
+# Results carrying "audio_cache_key" refer to one of these keys.
+STATIC_AUDIO_HINTS = {
+    "greeting": GREETING_RESPONSE,
+    "emergency_transfer": EMERGENCY_TRANSFER_RESPONSE,
+    "high_frustration": HIGH_FRUSTRATION_RESPONSE,
+    "tech_error": TECHNICAL_ERROR_RESPONSE,
+}
+
+# Local pre-screen patterns, checked before any API call
+_EMERGENCY_RE = re.compile(
+    r"\b(bleeding|unconscious|ambulance|dying|not breathing|can'?t breathe|heart attack"
+    r"|(?:am|is|are|was|were|got|badly|seriously) (?:injured|hurt))\b",
+    re.I
+)
+# Negations shortly before an emergency keyword ("nobody was hurt", "no ambulance needed")
+# leave the decision to the model
+_NEGATION_RE = re.compile(r"\b(no|not|nobody|none|never|without)\b|n't\b", re.I)
+_FRUSTRATION_RE = re.compile(
+    r"\b(angry|furious|frustrated|upset|annoyed|ridiculous|unacceptable|useless|fed up|waste of time)\b",
+    re.I
+)
+# Utterances that consist of nothing but a policy number, e.g. "my policy number is AC-12345"
+_POLICY_ONLY_RE = re.compile(
+    r"(?:(?:it'?s|it is|my|the|yes|sure)[, ]+)*(?:policy(?: number| id)?(?: is)? )?([A-Z]{0,3}-?\d{5,})[.!]?",
+    re.I
+)
+
+# Frustration prefix stored at the start of the claim description. The model sees the
+# stored description in CLAIM and may copy the prefix back when it rewrites it.
+_FRUSTRATION_PREFIX_RE = re.compile(r"^(?:\s*\[Frustration Score: [^\]]*\])+\s*")
+
+# Maximum number of prompt tokens spent on conversation history per turn
+HISTORY_TOKEN_BUDGET = 800
+HISTORY_SEPARATOR = "§"  # Keeps the per-turn user message on a single line
+
+
+def _load_encoding():
+    """
+    Load the gpt-4o-mini tokenizer once per process.
+    tiktoken downloads it on first use; without network access or a local tiktoken
+    cache, token counts fall back to an estimate instead of failing the NLU.
+    
+    Returns:
+        tiktoken Encoding, or None when unavailable
+    """
+    try:
+        return tiktoken.encoding_for_model("gpt-4o-mini")
+    except Exception as e:
+        print(f"[NLU] Tokenizer unavailable, estimating token counts: {e}")
+        return None
+
+_ENCODING = _load_encoding()
+_CHARS_PER_TOKEN = 4  # Rough average for English text, used without a tokenizer
+
+
+def _count_tokens(text: str) -> int:
+    """Number of tokens in text (estimated when the tokenizer is unavailable)."""
+    if _ENCODING is None:
+        return len(text) // _CHARS_PER_TOKEN
+    return len(_ENCODING.encode(text))
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to at most max_tokens tokens (estimated when the tokenizer is unavailable)."""
+    if _ENCODING is None:
+        return text[:max_tokens * _CHARS_PER_TOKEN]
+    return _ENCODING.decode(_ENCODING.encode(text)[:max_tokens])
+
+# Optional local emergency classifier (ONNX int8), loaded once at import; None if unavailable
+_EMERGENCY_CLASSIFIER = load_emergency_classifier()
+EMERGENCY_PROB_THRESHOLD = 0.8
+
+# Optional post-call enrichment (claim narrative, sentiment scoring) submitted to the
+# OpenAI Batch API once a call ends. Off the voice path and billed at the batch rate.
+POSTCALL_BATCH_ENABLED = os.getenv("NLU_POSTCALL_BATCH", "0") == "1"
+POSTCALL_MODEL = "gpt-4o"
+
+# Caller answers to the TO_REVIEW confirmation question
+_AFFIRM_RE = re.compile(
+    r"\b(yes|yep|yeah|y|correct|confirm|that's correct|all set|looks good|right|thanks|thank you|bye|goodbye)\b",
+    re.I
+)
+_NEG_RE = re.compile(r"\b(no|not|change|incorrect|wrong|edit|update|needs|nope)\b", re.I)
+
+
+# Background event loop shared by all NLU instances. Keeping one loop alive for the
+# whole process lets AsyncOpenAI reuse its pooled TCP/TLS connections across turns.
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_event_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the background event loop used for OpenAI calls, starting it on first use.
+    
+    Returns:
+        Running asyncio event loop owned by a daemon thread
+    """
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, name="nlu-event-loop", daemon=True).start()
+    return _event_loop
+
+
+def run_async(coro: Coroutine) -> Any:
+    """
+    Run a coroutine on the background event loop and block until it finishes.
+    Must not be called from the event loop thread itself.
+    
+    Args:
+        coro: Coroutine to run
+        
+    Returns:
+        The coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
 
 class ConversationState(Enum):
     """Track the current stage of the conversation."""
@@ -33,6 +167,331 @@ class ConversationState(Enum):
     EMERGENCY_TRANSFER = "emergency_transfer"
 
 
+# Plain dict lookup for model-reported state names; unknown names fall back to a safe default
+_STATE_BY_NAME = {s.name: s for s in ConversationState}
+
+
+@dataclass(slots=True)
+class ClaimData:
+    """Claim report fields collected during the call (text_to_ticket schema)."""
+    policyId: Optional[str] = None
+    customerName: Optional[str] = None
+    incidentType: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    estimatedDamage: Optional[float] = None
+    incidentDate: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the claim as a plain dictionary using the external schema keys."""
+        return {name: getattr(self, name) for name in CLAIM_FIELDS}
+
+
+CLAIM_FIELDS = tuple(f.name for f in fields(ClaimData))
+REQUIRED_CLAIM_FIELDS = ("policyId", "customerName", "incidentType", "description", "location")
+
+# (claim field, phrase) pairs for the spoken confirmation summary, in speaking order
+_SUMMARY_FIELDS = (
+    ("policyId", "policy number {}"),
+    ("customerName", "under the name {}"),
+    ("incidentType", "for a {}"),
+    ("location", "at {}"),
+    ("incidentDate", "on {}"),
+)
+
+# (claim field, state, question) for the policy-number shortcut: the first missing
+# required field decides what the caller is asked next
+_FOLLOW_UP_QUESTIONS = (
+    ("customerName", ConversationState.GATHERING_POLICY_INFO, "Could you tell me the full name on the policy?"),
+    ("incidentType", ConversationState.GATHERING_INCIDENT_DETAILS, "Could you tell me what happened?"),
+    ("description", ConversationState.GATHERING_INCIDENT_DETAILS, "Could you tell me what happened?"),
+    ("location", ConversationState.GATHERING_INCIDENT_DETAILS, "Where did this happen?"),
+)
+
+
+class ClaimExtraction(BaseModel):
+    """Claim fields extracted by the model in one turn (null when not mentioned)."""
+    model_config = ConfigDict(extra="forbid")
+
+    policyId: Optional[str]
+    customerName: Optional[str]
+    incidentType: Optional[str]
+    description: Optional[str]
+    location: Optional[str]
+    estimatedDamage: Optional[float]
+    incidentDate: Optional[str]
+
+
+class NLUTurn(BaseModel):
+    """
+    Structured output schema for one NLU turn, enforced server-side by OpenAI.
+    Field order matters: "response" comes last so the fields that decide whether
+    it is spoken are generated before it.
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    emergency_detected: bool
+    emergency_reason: str
+    frustration_score: float = Field(ge=0, le=10)
+    claim_data: ClaimExtraction
+    conversation_state: Literal[
+        "GREETING", "GATHERING_POLICY_INFO", "GATHERING_INCIDENT_DETAILS",
+        "GATHERING_DAMAGE_INFO", "CONFIRMING", "COMPLETE"
+    ]
+    response: str
+
+
+@dataclass(slots=True)
+class CacheQuery:
+    """A caller utterance normalized once per turn, shared by lookup() and store()."""
+    state: ConversationState
+    user_text: str
+    prompt: str                             # Assistant turn the caller is answering
+    key: str                                # Exact-match hash of state + prompt + normalized text
+    digits: List[str]                       # Numbers that must match for a semantic hit
+    embedding: Optional[np.ndarray] = None  # Filled in by lookup_similar()
+
+
+# Free-text claim fields that identify a caller. Turns that extract one of them are only
+# reused for the exact same utterance: "I'm John Smith" and "I'm Jane Smith" embed almost
+# identically, and a semantic hit would copy the other caller's details into the claim.
+_PERSONAL_CLAIM_FIELDS = ("customerName", "location")
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    """A cached model turn and the conditions under which it may be reused."""
+    embedding: Optional[np.ndarray]
+    state: ConversationState
+    prompt: str
+    claim_data: Dict[str, Any]
+    digits: List[str]
+    result: NLUTurn
+
+
+class SemanticResponseCache:
+    """
+    LRU cache of NLU results for repeated or paraphrased caller utterances.
+    An exact (state, question, text) hash is tried first; on a miss the utterance
+    is embedded and compared by cosine similarity against cached utterances
+    recorded in the same state, answering the same assistant question, with the
+    same claim data. Short answers ("yes", "no") only mean something together
+    with the question they answer.
+    """
+
+    def __init__(self, client: AsyncOpenAI, max_entries: int = 500,
+                 similarity_threshold: float = 0.92,
+                 embedding_model: str = "text-embedding-3-small"):
+        """
+        Initialize the cache.
+
+        Args:
+            client: Async OpenAI client used to compute utterance embeddings
+            max_entries: Maximum number of cached results before LRU eviction (default: 500)
+            similarity_threshold: Minimum cosine similarity for a semantic hit (default: 0.92)
+            embedding_model: OpenAI embedding model name
+        """
+        self.client = client
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model = embedding_model
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+
+    @staticmethod
+    def prepare(state: ConversationState, prompt: str, user_text: str) -> CacheQuery:
+        """
+        Normalize an utterance once for the lookups and store().
+
+        Args:
+            state: Conversation state the utterance was spoken in
+            prompt: Last assistant turn, i.e. the question being answered
+            user_text: Caller utterance
+
+        Returns:
+            CacheQuery for this turn
+        """
+        key = hashlib.sha256(
+            "\0".join((state.value, prompt, user_text.lower().strip())).encode("utf-8")
+        ).hexdigest()
+        # Numbers (policy ids, amounts, dates) must match exactly: embeddings of
+        # "policy 12345" and "policy 12346" are nearly identical.
+        return CacheQuery(state, user_text, prompt, key, re.findall(r"\d+", user_text))
+
+    async def _embed(self, user_text: str) -> Optional[np.ndarray]:
+        """Return the L2-normalized embedding of the utterance, or None on failure."""
+        try:
+            response = await self.client.embeddings.create(model=self.embedding_model, input=user_text)
+        except Exception as e:
+            print(f"[NLU Cache] Embedding failed: {e}")
+            return None
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def lookup_exact(self, query: CacheQuery, claim_data: Dict[str, Any]) -> Optional[NLUTurn]:
+        """
+        Find a cached result for exactly this utterance (no API call).
+
+        Args:
+            query: Utterance from prepare()
+            claim_data: Claim data collected so far
+
+        Returns:
+            Cached result, or None
+        """
+        entry = self._entries.get(query.key)
+        if entry is not None and entry.claim_data == claim_data:
+            self._entries.move_to_end(query.key)
+            return entry.result
+        return None
+
+    async def lookup_similar(self, query: CacheQuery, claim_data: Dict[str, Any]) -> Optional[NLUTurn]:
+        """
+        Find a cached result for a paraphrase of this utterance, by embedding it.
+        On a miss the query keeps the computed embedding, so store() does not recompute it.
+
+        Args:
+            query: Utterance from prepare()
+            claim_data: Claim data collected so far
+
+        Returns:
+            Cached result, or None
+        """
+        query.embedding = await self._embed(query.user_text)
+        if query.embedding is None:
+            return None
+
+        candidates = [
+            (k, e) for k, e in self._entries.items()
+            if e.embedding is not None and e.state == query.state and e.prompt == query.prompt
+            and e.claim_data == claim_data and e.digits == query.digits
+        ]
+        if not candidates:
+            return None
+
+        similarities = np.stack([e.embedding for _, e in candidates]) @ query.embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+
+        best_key, best_entry = candidates[best]
+        self._entries.move_to_end(best_key)
+        return best_entry.result
+
+    def store(self, query: CacheQuery, claim_data: Dict[str, Any], result: NLUTurn):
+        """
+        Cache the raw model result for an utterance.
+
+        Args:
+            query: Utterance passed to the lookups (no embedding disables semantic matching)
+            claim_data: Claim data collected before this utterance
+            result: Parsed turn returned by the model
+        """
+        embedding = query.embedding
+        extracted = result.claim_data
+        if any(getattr(extracted, name) not in (None, claim_data.get(name)) for name in _PERSONAL_CLAIM_FIELDS):
+            embedding = None
+        self._entries[query.key] = _CacheEntry(
+            embedding, query.state, query.prompt, dict(claim_data), query.digits, result
+        )
+        self._entries.move_to_end(query.key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget all cached results, e.g. when a new caller is on the line."""
+        self._entries.clear()
+
+
+class _ResponseFieldStreamer:
+    """
+    Incremental scanner over a streamed JSON object.
+    Decodes the top-level "response" string as its characters arrive so speech can
+    start before the rest of the object is generated.
+    """
+
+    _KEY_RE = re.compile(r'"response"\s*:\s*"')
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self):
+        self.buffer = ""       # Raw JSON received so far
+        self.text = ""         # Decoded response text received so far
+        self.key_start = None  # Buffer index where the "response" key begins
+        self.streaming = None  # Whether decoded text is forwarded (decided once the key is seen)
+        self._pos = 0          # Next buffer index to decode
+        self._done = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Consume a chunk of raw JSON.
+
+        Args:
+            chunk: Next piece of the streamed model output
+
+        Returns:
+            Newly decoded response text (empty string if none)
+        """
+        self.buffer += chunk
+        if self.key_start is None:
+            match = self._KEY_RE.search(self.buffer)
+            if match is None:
+                return ""
+            self.key_start = match.start()
+            self._pos = match.end()
+        if self._done:
+            return ""
+
+        buf = self.buffer
+        i = self._pos
+        decoded = []
+        while i < len(buf):
+            c = buf[i]
+            if c == '"':
+                self._done = True
+                break
+            if c == '\\':
+                if i + 1 >= len(buf):
+                    break  # Wait for the escaped character
+                if buf[i + 1] == 'u':
+                    if i + 6 > len(buf):
+                        break  # Wait for all four hex digits
+                    code = int(buf[i + 2:i + 6], 16)
+                    if 0xD800 <= code < 0xDC00:
+                        # High surrogate: combine with the following \uDCxx escape
+                        low = buf[i + 6:i + 12]
+                        if len(low) < 6 and "\\u".startswith(low[:2]):
+                            break  # Wait for the low surrogate
+                        if low[:2] == "\\u" and 0xDC00 <= int(low[2:], 16) < 0xE000:
+                            code = 0x10000 + ((code - 0xD800) << 10) + (int(low[2:], 16) - 0xDC00)
+                            i += 6
+                    decoded.append(chr(code))
+                    i += 6
+                else:
+                    decoded.append(self._ESCAPES.get(buf[i + 1], buf[i + 1]))
+                    i += 2
+                continue
+            decoded.append(c)
+            i += 1
+        self._pos = i
+
+        new_text = "".join(decoded)
+        self.text += new_text
+        return new_text
+
+    def parse_prefix(self) -> Optional[Dict[str, Any]]:
+        """
+        Parse the fields generated before the "response" key.
+
+        Returns:
+            Dictionary of the already complete fields, or None if they cannot be parsed
+        """
+        prefix = self.buffer[:self.key_start].rstrip().rstrip(",")
+        try:
+            return orjson.loads(prefix + "}")
+        except orjson.JSONDecodeError:
+            return None
+
+
 class ConversationalNLU:
     """
     Real-time NLU processing for insurance call handling.
@@ -42,31 +501,55 @@ class ConversationalNLU:
     
     def __init__(self):
         """Initialize the NLU with OpenAI client and conversation state."""
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.conversation_history: List[str] = []  # Context window
+        self.aclient = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=ASYNC_HTTP_CLIENT)
+        # Context window: last ("SPEAKER: text", token_count) turns sent to the model
+        self.conversation_history: Deque[Tuple[str, int]] = deque(maxlen=6)
         self.state = ConversationState.GREETING
-        self.claim_data = {
-            "policyId": None,
-            "customerName": None,
-            "incidentType": None,
-            "description": None,
-            "location": None,
-            "estimatedDamage": None,
-            "incidentDate": None
-        }
+        self.claim_data = ClaimData()
         self.frustration_score = 0.0
+        self._claim_data_json_cache: Optional[str] = None  # Compact JSON of claim_data for the prompt
+        self._claim_data_dirty = True
         self.base_system_prompt = self._build_base_system_prompt()  # Build once at start
+        self.response_cache = SemanticResponseCache(self.aclient)
+        self._full_transcript: List[str] = []  # Whole call, for post-call enrichment only
+        self._postcall_jobs: List[Dict[str, Any]] = []
         
-    def process_input(self, user_text: str) -> Dict[str, Any]:
+    def process_input(self, user_text: str,
+                      on_response_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Synchronous wrapper around process_input_async().
+        
+        Args:
+            user_text: Transcribed text from speech_to_text.py
+            on_response_delta: Optional callback for streamed response text
+                               (see process_input_async())
+            
+        Returns:
+            Same dictionary as process_input_async()
+        """
+        return run_async(self.process_input_async(user_text, on_response_delta))
+    
+    async def process_input_async(self, user_text: str,
+                                  on_response_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Process user input in real-time using a single OpenAI API call.
+        Awaiting this lets callers overlap the model round-trip with other work.
         
         Args:
             user_text: Transcribed text from speech_to_text.py
+            on_response_delta: Optional callback receiving pieces of the response text
+                               while the model is still generating. It runs on the event
+                               loop thread and must not block. Text is only forwarded once
+                               the fields generated before it show the model's response
+                               will be used unchanged (no transfer or confirmation summary).
             
         Returns:
             Dictionary containing:
                 - response: Text to send to text_to_speech.py
+                - audio_cache_key: Key in STATIC_AUDIO_HINTS when the response is a fixed
+                                   phrase (only present for those responses)
+                - response_streamed: Boolean, True if the full response was already
+                                     delivered through on_response_delta
                 - should_transfer: Boolean for emergency transfer
                 - transfer_reason: Reason for transfer (panic/injury)
                 - frustration_score: Float 0-10 indicating anger/frustration
@@ -74,47 +557,95 @@ class ConversationalNLU:
                 - state: Current conversation state
                 - is_complete: Boolean indicating if claim is ready
         """
+        streamer = _ResponseFieldStreamer() if on_response_delta else None
+        result = await self._process_input(user_text, streamer, on_response_delta)
+        result["response_streamed"] = bool(
+            streamer and streamer.streaming and streamer.text == result["response"]
+        )
+        return result
+    
+    async def _process_input(self, user_text: str, streamer: Optional[_ResponseFieldStreamer],
+                             on_response_delta: Optional[Callable[[str], None]]) -> Dict[str, Any]:
+        """Run one conversation turn, see process_input_async()."""
         # Add user input to context window
-        self.conversation_history.append(f"CALLER: {user_text}")
+        self._append_history("CALLER", user_text)
         # canonical is_complete flag for returns (keeps pipeline checks consistent)
         is_complete = False
         
+        # Local pre-screen: obvious emergencies transfer immediately, without waiting on the model
+        emergency_match = next(
+            (m for m in _EMERGENCY_RE.finditer(user_text)
+             if not _NEGATION_RE.search(user_text[max(0, m.start() - 25):m.start()])),
+            None
+        )
+        if emergency_match:
+            self.state = ConversationState.EMERGENCY_TRANSFER
+            self._append_history("ASSISTANT", EMERGENCY_TRANSFER_RESPONSE)
+            return {
+                "response": EMERGENCY_TRANSFER_RESPONSE,
+                "audio_cache_key": "emergency_transfer",
+                "should_transfer": True,
+                "transfer_reason": f"emergency_keyword_{emergency_match.group(1).lower()}",
+                "frustration_score": self.frustration_score,
+                "claim_data": self.claim_data.to_dict(),
+                "state": self.state.value,
+                "is_complete": False
+            }
+        
+        # Local pre-screen: a bare policy number is extracted deterministically
+        policy_match = _POLICY_ONLY_RE.fullmatch(user_text.strip())
+        if (policy_match and not _FRUSTRATION_RE.search(user_text)
+                and self.state in (ConversationState.GREETING, ConversationState.GATHERING_POLICY_INFO)):
+            self._set_claim_field("policyId", policy_match.group(1).upper())
+            if self._check_claim_completion():
+                # Policy number was the last missing field: confirm like the model path does
+                self.state = ConversationState.TO_REVIEW
+                response = self._confirmation_prompt()
+            else:
+                _, self.state, question = next(
+                    entry for entry in _FOLLOW_UP_QUESTIONS
+                    if getattr(self.claim_data, entry[0]) in (None, "", "null")
+                )
+                response = f"Thank you, I've noted your policy number. {question}"
+            self._append_history("ASSISTANT", response)
+            return {
+                "response": response,
+                "should_transfer": False,
+                "transfer_reason": "",
+                "frustration_score": self.frustration_score,
+                "claim_data": self.claim_data.to_dict(),
+                "state": self.state.value,
+                "is_complete": False
+            }
+        
         # --- existing local TO_REVIEW handling and other logic happen below ---
         # Local handling for the "to_review" confirmation flow (robust detection)
         if self.state == ConversationState.TO_REVIEW:
-            lc = user_text.lower().strip()
-
-            def is_affirmative(s: str) -> bool:
-                return bool(re.search(r'\b(yes|yep|yeah|y|correct|confirm|that\'s correct|all set|looks good|right|thanks|thank you|bye|goodbye)\b', s))
-
-            def is_negative(s: str) -> bool:
-                return bool(re.search(r'\b(no|not|change|incorrect|wrong|edit|update|needs|nope)\b', s))
-
-            if is_affirmative(lc):
+            if _AFFIRM_RE.search(user_text):
                 self.state = ConversationState.COMPLETE
                 is_complete = True
                 self.confirm_attempts = 0
-                self.conversation_history.append("ASSISTANT: Claim confirmed by caller.")
+                self._append_history("ASSISTANT", "Claim confirmed by caller.")
                 return {
                     "response": "Thank you! Your claim has been created successfully. Now you have to speak to a human operator to finish the report. I can either put you in line to speak with an agent now, the estimated waiting time is 5 minutes, or you can ask to be called back later. Which would you prefer?",
                     "should_transfer": False,
                     "transfer_reason": "",
                     "frustration_score": self.frustration_score,
-                    "claim_data": self.claim_data,
+                    "claim_data": self.claim_data.to_dict(),
                     "state": self.state.value,
                     "is_complete": True
                 }
 
             # Negative / change requests -> go back to collecting details
-            if is_negative(lc):
+            if _NEG_RE.search(user_text):
                 self.state = ConversationState.GATHERING_INCIDENT_DETAILS
-                self.conversation_history.append("ASSISTANT: Caller requested changes; returning to information collection.")
+                self._append_history("ASSISTANT", "Caller requested changes; returning to information collection.")
                 return {
                     "response": "I understand you'd like to make changes. Which detail would you like to update?",
                     "should_transfer": False,
                     "transfer_reason": "",
                     "frustration_score": self.frustration_score,
-                    "claim_data": self.claim_data,
+                    "claim_data": self.claim_data.to_dict(),
                     "state": self.state.value,
                     "is_complete": False
                 }
@@ -125,65 +656,83 @@ class ConversationalNLU:
                 "should_transfer": False,
                 "transfer_reason": "",
                 "frustration_score": self.frustration_score,
-                "claim_data": self.claim_data,
+                "claim_data": self.claim_data.to_dict(),
                 "state": self.state.value,
                 "is_complete": False
             }
         # end TO_REVIEW handling
          
-        # Build dynamic context (only what changes)
-        dynamic_context = f"""
- CURRENT STATE: {self.state.value}
- CURRENT CLAIM DATA: {json.dumps(self.claim_data, indent=2)}
-
- CONVERSATION:
-{chr(10).join(self.conversation_history[-6:])}
-"""
+        # Claim data is only re-serialized after a field actually changed
+        if self._claim_data_dirty:
+            self._claim_data_json_cache = orjson.dumps(self.claim_data.to_dict()).decode()
+            self._claim_data_dirty = False
+        
+        # Build dynamic context (only what changes), single line; format is described in the system prompt.
+        # The date lets the model resolve "yesterday" or "last Friday" into incidentDate.
+        dynamic_context = f"DATE={date.today().isoformat()}|STATE={self.state.value}|CLAIM={self._claim_data_json_cache}|HIST={self._render_history()}"
+        
+        # Model call runs as a task so the local classifier can cancel it
+        turn_task = asyncio.ensure_future(
+            self._fetch_turn(user_text, dynamic_context, streamer, on_response_delta)
+        )
+        if _EMERGENCY_CLASSIFIER is not None:
+            try:
+                emergency_prob = await asyncio.to_thread(_EMERGENCY_CLASSIFIER.predict, user_text)
+            except Exception as e:
+                print(f"[NLU] Local emergency classifier failed: {e}")
+                emergency_prob = 0.0
+            if emergency_prob > EMERGENCY_PROB_THRESHOLD:
+                turn_task.cancel()
+                self.state = ConversationState.EMERGENCY_TRANSFER
+                self._append_history("ASSISTANT", EMERGENCY_TRANSFER_RESPONSE)
+                return {
+                    "response": EMERGENCY_TRANSFER_RESPONSE,
+                    "audio_cache_key": "emergency_transfer",
+                    "should_transfer": True,
+                    "transfer_reason": f"emergency_classifier_{emergency_prob:.2f}",
+                    "frustration_score": self.frustration_score,
+                    "claim_data": self.claim_data.to_dict(),
+                    "state": self.state.value,
+                    "is_complete": False
+                }
         
         # Single API call with structured output request
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": self.base_system_prompt},
-                    {"role": "user", "content": dynamic_context}
-                ],
-                temperature=0.7,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
+            turn = await turn_task
             
             # Extract all information from single response
-            assistant_response = result.get("response", "I'm sorry, could you repeat that?")
-            emergency_detected = result.get("emergency_detected", False)
-            emergency_reason = result.get("emergency_reason", "")
-            self.frustration_score = float(result.get("frustration_score", 0.0))
+            assistant_response = turn.response
+            emergency_detected = turn.emergency_detected
+            emergency_reason = turn.emergency_reason
+            self.frustration_score = turn.frustration_score
             
             # Update claim data with any newly extracted information
-            extracted_claim = result.get("claim_data", {})
-            for key, value in extracted_claim.items():
-                if value and value != "null" and key in self.claim_data:
-                    # Prepend frustration score to description
-                    if key == "description" and value:
+            for key, value in turn.claim_data:
+                if value and value != "null":
+                    # Prepend frustration score to description, replacing any copied prefix
+                    if key == "description":
+                        value = _FRUSTRATION_PREFIX_RE.sub("", value)
+                        if not value:
+                            continue
                         value = f"[Frustration Score: {self.frustration_score}/10] {value}"
-                    self.claim_data[key] = value
+                    self._set_claim_field(key, value)
             
             # Update conversation state
-            self.state = ConversationState[result.get("conversation_state", "GATHERING_POLICY_INFO")]
+            self.state = _STATE_BY_NAME.get(turn.conversation_state, ConversationState.GATHERING_POLICY_INFO)
             
             # Add assistant response to context window
-            self.conversation_history.append(f"ASSISTANT: {assistant_response}")
+            self._append_history("ASSISTANT", assistant_response)
             
             # Check if emergency transfer needed
             if emergency_detected:
                 self.state = ConversationState.EMERGENCY_TRANSFER
                 return {
-                    "response": "I understand this is urgent. I'm connecting you with the emergency team who can better assist you. Please hold in line!",
+                    "response": EMERGENCY_TRANSFER_RESPONSE,
+                    "audio_cache_key": "emergency_transfer",
                     "should_transfer": True,
                     "transfer_reason": emergency_reason,
                     "frustration_score": self.frustration_score,
-                    "claim_data": self.claim_data,
+                    "claim_data": self.claim_data.to_dict(),
                     "state": self.state.value,
                     "is_complete": False
                 }
@@ -192,11 +741,12 @@ class ConversationalNLU:
             if self.frustration_score > 5.0:
                 self.state = ConversationState.EMERGENCY_TRANSFER
                 return {
-                    "response": "I can understand that there is a bit of frustration. Let me connect you with a specialist who can better help you right away. Please hold.",
+                    "response": HIGH_FRUSTRATION_RESPONSE,
+                    "audio_cache_key": "high_frustration",
                     "should_transfer": True,
                     "transfer_reason": f"high_frustration_{self.frustration_score}",
                     "frustration_score": self.frustration_score,
-                    "claim_data": self.claim_data,
+                    "claim_data": self.claim_data.to_dict(),
                     "state": self.state.value,
                     "is_complete": False
                 }
@@ -207,30 +757,16 @@ class ConversationalNLU:
                 # Move to TO_REVIEW and ask the caller to verify the extracted claim
                 self.state = ConversationState.TO_REVIEW
                 
-                # Create a brief natural summary instead of dumping JSON
-                summary_parts = []
-                if self.claim_data.get("policyId"):
-                    summary_parts.append(f"policy number {self.claim_data['policyId']}")
-                if self.claim_data.get("customerName"):
-                    summary_parts.append(f"under the name {self.claim_data['customerName']}")
-                if self.claim_data.get("incidentType"):
-                    summary_parts.append(f"for a {self.claim_data['incidentType']}")
-                if self.claim_data.get("location"):
-                    summary_parts.append(f"at {self.claim_data['location']}")
-                if self.claim_data.get("incidentDate"):
-                    summary_parts.append(f"on {self.claim_data['incidentDate']}")
-                
-                summary = ", ".join(summary_parts)
-                confirm_text = f"Let me confirm: I have {summary}. Is this correct?"
+                confirm_text = self._confirmation_prompt()
                 
                 # Add assistant confirmation prompt to history
-                self.conversation_history.append(f"ASSISTANT: {confirm_text}")
+                self._append_history("ASSISTANT", confirm_text)
                 return {
                     "response": confirm_text,
                     "should_transfer": False,
                     "transfer_reason": "",
                     "frustration_score": self.frustration_score,
-                    "claim_data": self.claim_data,
+                    "claim_data": self.claim_data.to_dict(),
                     "state": self.state.value,
                     "is_complete": False
                 }
@@ -243,7 +779,7 @@ class ConversationalNLU:
                  "should_transfer": False,
                  "transfer_reason": "",
                  "frustration_score": self.frustration_score,
-                 "claim_data": self.claim_data,
+                 "claim_data": self.claim_data.to_dict(),
                  "state": self.state.value,
                  "is_complete": final_is_complete
              }
@@ -251,19 +787,182 @@ class ConversationalNLU:
         except Exception as e:
             print(f"[NLU Error] {e}")
             return {
-                "response": "I apologize, I'm having technical difficulties. Let me connect you with an agent.",
+                "response": TECHNICAL_ERROR_RESPONSE,
+                "audio_cache_key": "tech_error",
                 "should_transfer": True,
                 "transfer_reason": "technical_error",
                 "frustration_score": self.frustration_score,
-                "claim_data": self.claim_data,
+                "claim_data": self.claim_data.to_dict(),
                 "state": self.state.value,
                 "is_complete": False
             }
     
+    async def _fetch_turn(self, user_text: str, dynamic_context: str,
+                          streamer: Optional[_ResponseFieldStreamer],
+                          on_response_delta: Optional[Callable[[str], None]]) -> NLUTurn:
+        """
+        Get the model's turn for an utterance, from the response cache when possible.
+        
+        Args:
+            user_text: Transcribed caller text
+            dynamic_context: Per-turn user message (state, claim data, history)
+            streamer: Response field streamer, or None for a non-streaming call
+            on_response_delta: Callback for streamed response text
+            
+        Returns:
+            Parsed NLUTurn
+        """
+        # Repeated utterances reuse a previous result without calling the model
+        claim_snapshot = self.claim_data.to_dict()
+        cache_query = self.response_cache.prepare(self.state, self._last_assistant_turn(), user_text)
+        cached_result = self.response_cache.lookup_exact(cache_query, claim_snapshot)
+        if cached_result is not None:
+            return cached_result
+        
+        # Paraphrases need an embedding request: run it alongside the model call instead of
+        # before it, and drop the model call on a hit. Streamed text is held back until the
+        # lookup has missed, so a cancelled call is never spoken.
+        held_deltas: Optional[List[str]] = [] if on_response_delta else None
+        
+        def forward_delta(text: str):
+            if held_deltas is None:
+                on_response_delta(text)
+            else:
+                held_deltas.append(text)
+        
+        model_task = asyncio.ensure_future(
+            self._request_turn(dynamic_context, streamer, forward_delta if on_response_delta else None)
+        )
+        # A dropped call may still have failed; retrieve its exception so it is not logged
+        model_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            cached_result = await self.response_cache.lookup_similar(cache_query, claim_snapshot)
+            if cached_result is not None:
+                if streamer is not None:
+                    streamer.streaming = False  # Held-back text was never spoken
+                return cached_result
+            if held_deltas:
+                on_response_delta("".join(held_deltas))
+            held_deltas = None
+            turn = await model_task
+        finally:
+            model_task.cancel()  # No-op once finished; stops the call on a hit or cancellation
+        self.response_cache.store(cache_query, claim_snapshot, turn)
+        return turn
+    
+    async def _request_turn(self, dynamic_context: str, streamer: Optional[_ResponseFieldStreamer],
+                            on_response_delta: Optional[Callable[[str], None]]) -> NLUTurn:
+        """
+        Call the model for one turn.
+        
+        Args:
+            dynamic_context: Per-turn user message (state, claim data, history)
+            streamer: Response field streamer, or None for a non-streaming call
+            on_response_delta: Callback for streamed response text
+            
+        Returns:
+            Parsed NLUTurn
+        """
+        messages = [
+            {"role": "system", "content": self.base_system_prompt},
+            {"role": "user", "content": dynamic_context}
+        ]
+        if streamer is None:
+            completion = await self.aclient.chat.completions.parse(
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.7,
+                response_format=NLUTurn
+            )
+        else:
+            completion = await self._stream_completion(messages, streamer, on_response_delta)
+        self._log_usage(completion.usage)
+        
+        message = completion.choices[0].message
+        if message.parsed is None:
+            raise ValueError(f"Model refused to answer: {message.refusal}")
+        return message.parsed
+    
+    async def _stream_completion(self, messages: List[Dict[str, str]], streamer: _ResponseFieldStreamer,
+                                 on_response_delta: Callable[[str], None]):
+        """
+        Stream the structured completion and forward response text as it arrives.
+        
+        Args:
+            messages: Chat messages for the request
+            streamer: Scanner accumulating the raw JSON output
+            on_response_delta: Callback receiving decoded response text
+            
+        Returns:
+            The final parsed completion
+        """
+        async with self.aclient.chat.completions.stream(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.7,
+            response_format=NLUTurn,
+            stream_options={"include_usage": True}
+        ) as stream:
+            async for event in stream:
+                if event.type != "content.delta":
+                    continue
+                new_text = streamer.feed(event.delta)
+                if streamer.streaming is None and streamer.key_start is not None:
+                    streamer.streaming = self._response_is_final(streamer.parse_prefix())
+                if new_text and streamer.streaming:
+                    on_response_delta(new_text)
+            return await stream.get_final_completion()
+    
+    @staticmethod
+    def _log_usage(usage):
+        """
+        Log prompt token usage, including how much of the prompt was served from
+        OpenAI's prompt cache (the static system prompt prefix).
+        
+        Args:
+            usage: Usage object returned with the completion (may be None)
+        """
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        print(f"[NLU] Prompt tokens: {usage.prompt_tokens} (cached: {cached_tokens})")
+    
+    def _response_is_final(self, partial_result: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check whether the model's response will be spoken unchanged, based on the
+        fields generated before it. Transfers and the confirmation summary replace it.
+        
+        Args:
+            partial_result: Fields parsed from the output preceding "response"
+            
+        Returns:
+            Boolean indicating if the response text can be streamed to the caller
+        """
+        if not partial_result or partial_result.get("emergency_detected", True):
+            return False
+        try:
+            if float(partial_result["frustration_score"]) > 5.0:
+                return False
+            next_state = _STATE_BY_NAME.get(partial_result["conversation_state"],
+                                            ConversationState.GATHERING_POLICY_INFO)
+        except (KeyError, TypeError, ValueError):
+            return False
+        if next_state in (ConversationState.TO_REVIEW, ConversationState.COMPLETE):
+            return True
+        
+        merged_claim = self.claim_data.to_dict()
+        for key, value in (partial_result.get("claim_data") or {}).items():
+            if value and value != "null" and key in merged_claim:
+                merged_claim[key] = value
+        return not all(merged_claim[field] and merged_claim[field] != "null" for field in REQUIRED_CLAIM_FIELDS)
+    
     def _build_base_system_prompt(self) -> str:
         """
         Build base system prompt once at initialization.
         Dynamic context (state, claim data, conversation) is passed separately.
+        The prompt must stay byte-identical across calls and above 1024 tokens so
+        OpenAI's automatic prompt caching reuses it as a cached prefix.
         
         Returns:
             Base system prompt string with all instructions
@@ -313,6 +1012,41 @@ YOUR TASKS (in priority order):
    - Keep tone professional but warm
    - Return as "response": "<text>"
 
+FIELD GUIDELINES:
+   - policyId: Copy the policy number exactly as given, keeping letters, digits and dashes
+     (e.g. "AC-12345"). If the caller spells it out ("A C one two three"), join it into one
+     identifier ("AC123"). Never invent or guess a policy number.
+   - customerName: The policy holder's full name as spoken, with each name capitalized.
+   - incidentType: A short category such as "Vehicle Accident", "Theft", "Vandalism",
+     "Fire Damage", "Water Damage", "Storm Damage", "Property Damage" or "Personal Injury".
+   - description: One or two plain sentences summarizing what happened, written in the
+     third person and including relevant details (vehicles, people involved, cause).
+     When the caller adds details later, return the full updated description.
+   - location: The most specific place mentioned (street, intersection, city or address).
+   - estimatedDamage: A number in USD without currency symbols or thousands separators
+     (e.g. "around three thousand dollars" -> 3000.0). Use null if no amount was given.
+   - incidentDate: YYYY-MM-DD. Resolve relative dates ("yesterday", "last Friday") against
+     the DATE given in the input. Use null if the caller has not said when it happened.
+   - Use null for anything the caller has not said. Do not fill fields with placeholders
+     such as "unknown", "N/A" or empty strings.
+
+HOW YOUR OUTPUT IS USED:
+   - "response" is spoken to the caller by a text-to-speech voice, as soon as it is
+     generated. The caller hears it; they never see it.
+   - Each non-null value in "claim_data" replaces the stored value of that field; null
+     leaves the stored value unchanged. CLAIM in the input always holds everything
+     collected so far, so nothing is lost by returning null for fields you already have.
+   - When "emergency_detected" is true, "response" is not used: the caller hears a fixed
+     message and is transferred to the emergency team.
+   - When "frustration_score" is above 5, "response" is not used either: the caller hears a
+     fixed message and is transferred to a specialist.
+   - Once policyId, customerName, incidentType, description and location are all known,
+     the system reads a summary of the claim back to the caller and handles their
+     confirmation itself. Corrections requested at that point come back to you in
+     GATHERING_INCIDENT_DETAILS.
+   - HIST only contains the most recent turns; older turns are dropped to keep each request
+     small, so rely on CLAIM for details given earlier in the call.
+
 REQUIRED JSON OUTPUT FORMAT:
 {{
     "emergency_detected": <boolean>,
@@ -331,7 +1065,73 @@ REQUIRED JSON OUTPUT FORMAT:
     "response": "<your natural language response>"
 }}
 
-Remember: Return ONLY valid JSON. Be empathetic and guide the conversation naturally."""
+Remember: Return ONLY valid JSON. Be empathetic and guide the conversation naturally.
+
+INPUT FORMAT:
+Each user message is one line of four "|"-separated parts:
+   - DATE=<today's date, YYYY-MM-DD>
+   - STATE=<current conversation state>
+   - CLAIM=<claim data collected so far, as compact JSON>
+   - HIST=<recent conversation turns, oldest first, separated by "§", each starting with
+     "CALLER:" or "ASSISTANT:". The last CALLER turn is the one to answer.>"""
+    
+    def _append_history(self, speaker: str, text: str):
+        """
+        Add a turn to the context window. The line is formatted and tokenized
+        once on insert and reused for every later prompt and the transcript.
+        
+        Args:
+            speaker: "CALLER" or "ASSISTANT"
+            text: What was said
+        """
+        line = f"{speaker}: {text}"
+        self.conversation_history.append((line, _count_tokens(line)))
+        if POSTCALL_BATCH_ENABLED:
+            self._full_transcript.append(line)
+    
+    def _last_assistant_turn(self) -> str:
+        """
+        Get the most recent assistant line in the context window.
+        
+        Returns:
+            "ASSISTANT: ..." line, or "" before the assistant has spoken
+        """
+        for line, _ in reversed(self.conversation_history):
+            if line.startswith("ASSISTANT: "):
+                return line
+        return ""
+    
+    def _render_history(self) -> str:
+        """
+        Render the most recent turns that fit in HISTORY_TOKEN_BUDGET.
+        The newest turn is always included, truncated if it alone exceeds the budget.
+        
+        Returns:
+            Conversation turns joined by HISTORY_SEPARATOR, oldest first
+        """
+        lines = []
+        remaining = HISTORY_TOKEN_BUDGET
+        for line, token_count in reversed(self.conversation_history):
+            if token_count > remaining:
+                if not lines:
+                    lines.append(_truncate_tokens(line, remaining))
+                break
+            lines.append(line)
+            remaining -= token_count
+        return HISTORY_SEPARATOR.join(reversed(lines))
+    
+    def _set_claim_field(self, key: str, value: Any):
+        """
+        Update a claim field, invalidating the cached JSON only if the value changed.
+        Keys outside the claim schema are ignored.
+        
+        Args:
+            key: Claim field name
+            value: New value
+        """
+        if key in ClaimData.__slots__ and getattr(self.claim_data, key) != value:
+            setattr(self.claim_data, key, value)
+            self._claim_data_dirty = True
     
     def _check_claim_completion(self) -> bool:
         """
@@ -340,12 +1140,25 @@ Remember: Return ONLY valid JSON. Be empathetic and guide the conversation natur
         Returns:
             Boolean indicating if claim is complete and ready for submission
         """
-        required_fields = ["policyId", "customerName", "incidentType", "description", "location"]
         return all(
-            self.claim_data.get(field) and self.claim_data.get(field) != "null"
-            for field in required_fields
+            (value := getattr(self.claim_data, field)) and value != "null"
+            for field in REQUIRED_CLAIM_FIELDS
         )
     
+    def _confirmation_prompt(self) -> str:
+        """
+        Build the spoken summary the caller confirms before the claim is created.
+        
+        Returns:
+            Brief natural summary of the claim ending in a yes/no question
+        """
+        summary = ", ".join(
+            template.format(value)
+            for field, template in _SUMMARY_FIELDS
+            if (value := getattr(self.claim_data, field))
+        )
+        return f"Let me confirm: I have {summary}. Is this correct?"
+    
     def get_greeting(self) -> str:
         """
         Get initial greeting message.
@@ -353,21 +1166,130 @@ Remember: Return ONLY valid JSON. Be empathetic and guide the conversation natur
         Returns:
             Greeting text for text_to_speech.py
         """
-        greeting = "Hello! Thank you for calling InsurTech. How may I assist you today?"
-        self.conversation_history.append(f"ASSISTANT: {greeting}")
+        greeting = GREETING_RESPONSE
+        self._append_history("ASSISTANT", greeting)
+        # Warm the connection while the greeting is being spoken
+        self.warm_up()
         return greeting
     
+    def warm_up(self):
+        """
+        Open the OpenAI connection in the background, without waiting for it.
+        Called for every greeting; servers can also call it at startup.
+        """
+        asyncio.run_coroutine_threadsafe(self._warm_api(), get_event_loop())
+    
+    async def _warm_api(self):
+        """
+        Send a 1-token request so DNS, TLS and HTTP/2 setup happen before the first turn.
+        Sending the system prompt also primes OpenAI's prompt cache for it.
+        Failures are ignored; the first real turn will simply be slower.
+        """
+        try:
+            await self.aclient.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": self.base_system_prompt},
+                    {"role": "user", "content": "ok"}
+                ],
+                max_tokens=1
+            )
+            print("[NLU] API connection warmed up")
+        except Exception as e:
+            print(f"[NLU] Warm-up request failed: {e}")
+    
+    def _queue_postcall_jobs(self):
+        """
+        Queue the optional post-call enrichment requests for the finished call.
+        Each job is one line of the Batch API JSONL input.
+        """
+        if not self._full_transcript:
+            return
+        transcript = "\n".join(self._full_transcript)
+        claim_json = orjson.dumps(self.claim_data.to_dict()).decode()
+        call_id = hashlib.sha256(transcript.encode("utf-8")).hexdigest()[:16]
+        prompts = {
+            "narrative": (
+                "Write a polished, factual claim narrative (one paragraph) for the insurance "
+                "adjuster, based on this call transcript and the extracted claim data."
+            ),
+            "sentiment": (
+                "Score the caller's sentiment over this call. Respond in JSON with "
+                '"overall_sentiment" (-1.0 to 1.0), "peak_frustration" (0-10) and '
+                '"ambiguous_turns" (list of caller quotes that were hard to classify).'
+            ),
+        }
+        for task, instruction in prompts.items():
+            self._postcall_jobs.append({
+                "custom_id": f"{call_id}-{task}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": POSTCALL_MODEL,
+                    "messages": [
+                        {"role": "system", "content": instruction},
+                        {"role": "user", "content": f"CLAIM DATA: {claim_json}\n\nTRANSCRIPT:\n{transcript}"},
+                    ],
+                },
+            })
+        self._full_transcript = []
+    
+    async def _submit_postcall_batch(self, jobs: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Upload queued jobs as JSONL and create a Batch API job.
+        
+        Args:
+            jobs: Batch request lines
+            
+        Returns:
+            Batch id, or None if submission failed
+        """
+        try:
+            jsonl = b"\n".join(orjson.dumps(job) for job in jobs)
+            batch_file = await self.aclient.files.create(
+                file=("postcall_jobs.jsonl", jsonl), purpose="batch"
+            )
+            batch = await self.aclient.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+                metadata={"source": "forge_postcall"}
+            )
+            print(f"[NLU] Post-call batch submitted: {batch.id} ({len(jobs)} requests)")
+            return batch.id
+        except Exception as e:
+            print(f"[NLU] Post-call batch submission failed: {e}")
+            return None
+    
+    def flush_postcall_jobs(self, wait: bool = True) -> Optional[str]:
+        """
+        Submit the finished call's enrichment jobs to the OpenAI Batch API.
+        Does nothing unless NLU_POSTCALL_BATCH=1.
+        
+        Args:
+            wait: Block until the batch is created; otherwise submit in the background
+            
+        Returns:
+            Batch id when waiting and a batch was created, else None
+        """
+        if not POSTCALL_BATCH_ENABLED:
+            return None
+        self._queue_postcall_jobs()
+        if not self._postcall_jobs:
+            return None
+        jobs, self._postcall_jobs = self._postcall_jobs, []
+        if wait:
+            return run_async(self._submit_postcall_batch(jobs))
+        asyncio.run_coroutine_threadsafe(self._submit_postcall_batch(jobs), get_event_loop())
+        return None
+    
     def reset(self):
         """Reset conversation for new call."""
-        self.conversation_history = []
+        self.flush_postcall_jobs(wait=False)
+        self.conversation_history.clear()
         self.state = ConversationState.GREETING
-        self.claim_data = {
-            "policyId": None,
-            "customerName": None,
-            "incidentType": None,
-            "description": None,
-            "location": None,
-            "estimatedDamage": None,
-            "incidentDate": None
-        }
-        self.frustration_score = 0.0
\ No newline at end of file
+        self.claim_data = ClaimData()
+        self._claim_data_dirty = True
+        self.frustration_score = 0.0
+        # Cached turns hold the previous caller's words and extracted details
+        self.response_cache.clear()
\ No newline at end of file
@@ -4,11 +4,20 @@ Handles communication with n8n automation workflows.
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 from typing import Optional, Dict, Any
 from datetime import datetime
 
 
+# Fields every incident payload must contain, in the order they are reported missing
+REQUIRED_INCIDENT_FIELDS = (
+    "policyId", "customerName", "incidentDate",
+    "incidentType", "description", "location", "estimatedDamage"
+)
+
+
 class N8NWebhookClient:
     """
     Client for posting incident data to n8n webhooks.
@@ -18,6 +27,7 @@ class N8NWebhookClient:
     def __init__(self, webhook_url: str, timeout: int = 30):
         """
         Initialize the n8n webhook client.
+        Posts share one keep-alive session, so only the first one pays for the TCP/TLS handshake.
         
         Args:
             webhook_url: The n8n webhook URL (e.g., https://your-n8n.com/webhook/incident)
@@ -25,6 +35,15 @@ class N8NWebhookClient:
         """
         self.webhook_url = webhook_url
         self.timeout = timeout
+        self.session = requests.Session()
+        # Only failed connections are retried (POST is not idempotent), with a short backoff
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, read=0, status=0, backoff_factor=0.1)
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
     def post_incident(
         self,
@@ -70,9 +89,9 @@ class N8NWebhookClient:
         
         try:
             # Make POST request to n8n webhook
-            response = requests.post(
+            response = self.session.post(
                 self.webhook_url,
-                json=payload,
+                data=orjson.dumps(payload),
                 headers={"Content-Type": "application/json"},
                 timeout=self.timeout
             )
@@ -87,9 +106,9 @@ class N8NWebhookClient:
                 return {
                     "success": True,
                     "status_code": response.status_code,
-                    "response": response.json()
+                    "response": orjson.loads(response.content)
                 }
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 return {
                     "success": True,
                     "status_code": response.status_code,
@@ -144,20 +163,15 @@ class N8NWebhookClient:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        required_fields = [
-            "policyId", "customerName", "incidentDate", 
-            "incidentType", "description", "location", "estimatedDamage"
-        ]
-        
         # Check for missing fields
-        for field in required_fields:
+        for field in REQUIRED_INCIDENT_FIELDS:
             if field not in incident_data:
                 return False, f"Missing required field: {field}"
         
         # Validate date format (basic check)
         try:
             datetime.strptime(incident_data["incidentDate"], "%Y-%m-%d")
-        except ValueError:
+        except (TypeError, ValueError):  # TypeError: no date given (None)
             return False, "incidentDate must be in YYYY-MM-DD format"
         
         # Validate estimated damage is numeric
@@ -2,40 +2,105 @@
 Speech-to-Text module with separate audio capture and recognition components.
 """
 
-import json
+import os
 import queue
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+import orjson
 import sounddevice as sd
 from vosk import Model, KaldiRecognizer
 
+try:
+    # The binding's CFFI handle lets AcceptWaveform read Python buffers without copying
+    from vosk import _ffi as _vosk_ffi
+except ImportError:
+    _vosk_ffi = None
+
+try:
+    # Optional backend: int8 CTranslate2 Whisper (STT_BACKEND=whisper)
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+# Returned for partial results with no new text, so unchanged partials are not re-parsed
+_EMPTY_PARTIAL = {'text': '', 'partial': True, 'result': {'partial': ''}}
+
+
+@lru_cache(maxsize=4)
+def _get_vosk_model(model_path: str) -> Model:
+    """
+    Load a Vosk model once per process; later recognizers share the same instance.
+    
+    Args:
+        model_path: Path to the Vosk model directory
+        
+    Returns:
+        Loaded Vosk Model
+    """
+    return Model(model_path)
+
+
+@lru_cache(maxsize=2)
+def _get_whisper_model(model_size: str):
+    """
+    Load a faster-whisper model once per process, quantized to int8 for CPU.
+    
+    Args:
+        model_size: Model name or path (e.g. "small.en")
+        
+    Returns:
+        Loaded WhisperModel
+    """
+    return WhisperModel(model_size, device="cpu", compute_type="int8", num_workers=2)
+
 
 class AudioCapture:
     """
     Handles real-time audio capture from microphone using sounddevice.
     Manages audio streaming and device configuration.
+    
+    Captured samples go into a pre-allocated single-producer/single-consumer ring
+    buffer: the sounddevice callback only copies into it and advances the write
+    index, the recognition loop reads memoryviews and advances the read index.
+    No locks and no per-block allocation in the realtime callback.
     """
     
-    def __init__(self, sample_rate: int = 16000, channels: int = 1, blocksize: int = 8000):
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, blocksize: int = 2048,
+                 ring_blocks: int = 64):
         """
         Initialize the audio capture system.
         
         Args:
             sample_rate: Audio sample rate in Hz (default: 16000)
             channels: Number of audio channels, 1 for mono (default: 1)
-            blocksize: Number of frames per buffer (default: 8000)
+            blocksize: Number of frames per buffer, preferably a power of 2
+                       (default: 2048, 128ms at 16kHz)
+            ring_blocks: Ring buffer capacity in blocks (default: 64, ~8s at the defaults)
         """
         self.sample_rate = sample_rate
         self.channels = channels
         self.blocksize = blocksize
-        self.audio_queue = queue.Queue()
         self.stream = None
+        
+        # Ring buffer of int16 samples. _head is only written by the audio callback,
+        # _tail only by the consumer; both count samples and never wrap.
+        self._ring = np.zeros(blocksize * channels * ring_blocks, dtype=np.int16)
+        self._head = 0
+        self._tail = 0
+        self._pending_end = 0  # Read index to commit when the current view is released
+        self._data_ready = threading.Event()  # Set by the callback after each write
+        self._overruns = 0
     
     def _audio_callback(self, indata, frames, time_info, status):
         """
         Internal callback function invoked by sounddevice for each audio block.
-        Converts incoming audio data to bytes and queues it for processing.
+        Copies the incoming samples into the ring buffer.
         
         Args:
-            indata: Input audio data as numpy array
+            indata: Input audio data as a raw CFFI buffer
             frames: Number of frames in the buffer
             time_info: Time information dictionary
             status: Status flags indicating any issues
@@ -43,8 +108,23 @@ class AudioCapture:
         if status:
             print(f"[AudioCapture] Warning: {status}")
         
-        # Convert numpy array to bytes and add to processing queue
-        self.audio_queue.put(bytes(indata))
+        samples = np.frombuffer(indata, dtype=np.int16)
+        count = samples.shape[0]
+        capacity = self._ring.shape[0]
+        head = self._head
+        if head - self._tail + count > capacity:
+            # Consumer fell behind: drop this block rather than overwrite unread audio
+            self._overruns += 1
+            return
+        
+        start = head % capacity
+        first = min(count, capacity - start)
+        self._ring[start:start + first] = samples[:first]
+        if first < count:
+            self._ring[:count - first] = samples[first:]
+        # Publish only after the samples are in place, then wake the consumer
+        self._head = head + count
+        self._data_ready.set()
     
     def start_stream(self, device=None):
         """
@@ -57,7 +137,7 @@ class AudioCapture:
         Returns:
             The active audio stream object
         """
-        # Clear any existing audio data in the queue
+        # Clear any existing audio data in the buffer
         self._clear_queue()
         
         print(f"[AudioCapture] Starting audio stream (Sample rate: {self.sample_rate} Hz, Channels: {self.channels})")
@@ -69,6 +149,7 @@ class AudioCapture:
             device=device,
             dtype='int16',  # 16-bit audio
             channels=self.channels,
+            latency='low',  # Small device buffers: recognition sees speech sooner
             callback=self._audio_callback
         )
         
@@ -85,14 +166,54 @@ class AudioCapture:
             self.stream.stop()
             self.stream.close()
             self.stream = None
+            if self._overruns:
+                print(f"[AudioCapture] Warning: dropped {self._overruns} blocks (buffer full)")
+                self._overruns = 0
+    
+    def get_audio_view(self, timeout: Optional[float] = None) -> Optional[memoryview]:
+        """
+        Get a zero-copy view of the captured audio that has not been consumed yet.
+        The view stays valid until release_audio_view() is called.
+        
+        Args:
+            timeout: Maximum time to wait for audio in seconds (None = wait forever)
+            
+        Returns:
+            Byte memoryview over contiguous raw int16 samples, or None on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._head == self._tail:
+            # Clear before re-checking so a write in between is never missed
+            self._data_ready.clear()
+            if self._head != self._tail:
+                break
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self._data_ready.wait(remaining)
+        
+        capacity = self._ring.shape[0]
+        tail = self._tail
+        start = tail % capacity
+        count = min(self._head - tail, capacity - start)
+        self._pending_end = tail + count
+        return memoryview(self._ring[start:start + count]).cast('B')
+    
+    def release_audio_view(self):
+        """
+        Mark the audio returned by the last get_audio_view() as consumed,
+        freeing its space in the ring buffer.
+        """
+        # The buffer may have been cleared meanwhile; never move the read index back
+        self._tail = max(self._tail, self._pending_end)
     
     def get_audio_data(self, block=True, timeout=None):
         """
-        Retrieve captured audio data from the queue.
-        This is called by the recognition system to get audio for processing.
+        Retrieve captured audio data as bytes.
+        This copies the data; the recognition loop uses get_audio_view() instead.
         
         Args:
-            block: Whether to wait for data if queue is empty (default: True)
+            block: Whether to wait for data if the buffer is empty (default: True)
             timeout: Maximum time to wait in seconds (None = wait forever)
             
         Returns:
@@ -101,18 +222,19 @@ class AudioCapture:
         Raises:
             queue.Empty: If no data available and block=False or timeout exceeded
         """
-        return self.audio_queue.get(block=block, timeout=timeout)
+        view = self.get_audio_view(timeout=timeout if block else 0)
+        if view is None:
+            raise queue.Empty
+        data = bytes(view)
+        self.release_audio_view()
+        return data
     
     def _clear_queue(self):
         """
-        Remove all pending audio data from the queue.
+        Discard all pending audio data in the ring buffer.
         Used when starting a new stream to avoid processing old data.
         """
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except queue.Empty:
-                break
+        self._tail = self._head
     
     def is_active(self):
         """
@@ -151,12 +273,13 @@ class VoskRecognizer:
         self.sample_rate = sample_rate
         self.model = None
         self.recognizer = None
+        self._last_partial_raw = ""  # Raw JSON of the last partial result
         
         self._load_model()
     
     def _load_model(self):
         """
-        Load the Vosk language model from disk.
+        Load the Vosk language model (cached per process) and create the recognizer.
         This is called during initialization to prepare the recognizer.
         
         Raises:
@@ -164,39 +287,49 @@ class VoskRecognizer:
         """
         try:
             print(f"[VoskRecognizer] Loading model from: {self.model_path}")
-            self.model = Model(self.model_path)
+            self.model = _get_vosk_model(self.model_path)
             self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
             self.recognizer.SetWords(True)  # Enable word-level timestamps
             print("[VoskRecognizer] Model loaded successfully")
         except Exception as e:
             raise RuntimeError(f"Failed to load Vosk model from {self.model_path}: {e}")
     
-    def process_audio(self, audio_data: bytes):
+    def process_audio(self, audio_data):
         """
         Process a chunk of audio data and return recognition results.
         This is the main recognition function called for each audio block.
         
         Args:
-            audio_data: Raw audio bytes from the microphone
+            audio_data: Raw audio bytes or memoryview from the microphone
             
         Returns:
             Dictionary containing:
-                - 'text': Recognized text (empty string if no speech detected)
+                - 'text': Recognized text (empty string if no speech detected or
+                          the partial result did not change since the last block)
                 - 'partial': Boolean indicating if this is a partial or final result
                 - 'result': Full JSON result from Vosk with additional metadata
         """
-        # Feed audio data to recognizer
+        # Feed audio data to recognizer. Buffers (ring buffer memoryviews) are wrapped
+        # as CFFI char arrays pointing at the same memory instead of copied to bytes.
+        if not isinstance(audio_data, bytes):
+            audio_data = _vosk_ffi.from_buffer(audio_data) if _vosk_ffi is not None else bytes(audio_data)
         if self.recognizer.AcceptWaveform(audio_data):
             # Final result: end of utterance detected
-            result = json.loads(self.recognizer.Result())
+            self._last_partial_raw = ""
+            result = orjson.loads(self.recognizer.Result())
             return {
                 'text': result.get('text', ''),
                 'partial': False,
                 'result': result
             }
         else:
-            # Partial result: speech in progress
-            partial_result = json.loads(self.recognizer.PartialResult())
+            # Partial result: speech in progress. Most blocks leave it unchanged or empty;
+            # compare the raw JSON and only parse when there is new text.
+            raw = self.recognizer.PartialResult()
+            if raw == self._last_partial_raw or '"partial" : ""' in raw:
+                return _EMPTY_PARTIAL
+            self._last_partial_raw = raw
+            partial_result = orjson.loads(raw)
             return {
                 'text': partial_result.get('partial', ''),
                 'partial': True,
@@ -211,7 +344,7 @@ class VoskRecognizer:
         Returns:
             Dictionary containing the final result from Vosk
         """
-        final = json.loads(self.recognizer.FinalResult())
+        final = orjson.loads(self.recognizer.FinalResult())
         return {
             'text': final.get('text', ''),
             'partial': False,
@@ -226,6 +359,103 @@ class VoskRecognizer:
         print("[VoskRecognizer] Resetting recognizer")
         self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
         self.recognizer.SetWords(True)
+        self._last_partial_raw = ""
+
+
+class WhisperRecognizer:
+    """
+    Speech recognition with faster-whisper (int8), as an alternative to Vosk.
+    Whisper transcribes whole segments rather than streaming, so audio is collected
+    until the caller pauses (simple energy endpointing) and then transcribed once.
+    Has the same interface as VoskRecognizer; partial results are always empty.
+    """
+    
+    def __init__(self, model_size: str = "small.en", sample_rate: int = 16000,
+                 silence_threshold: int = 500, end_silence: float = 0.7, max_segment: float = 15.0):
+        """
+        Initialize the Whisper recognizer.
+        
+        Args:
+            model_size: faster-whisper model name or path (default: small.en)
+            sample_rate: Audio sample rate in Hz, must match audio capture (default: 16000)
+            silence_threshold: RMS level (int16) below which a block counts as silence
+            end_silence: Seconds of silence after speech that end an utterance
+            max_segment: Longest utterance in seconds before it is transcribed anyway
+        """
+        if WhisperModel is None:
+            raise RuntimeError("faster-whisper is not installed (pip install faster-whisper)")
+        self.sample_rate = sample_rate
+        self.silence_threshold = silence_threshold
+        self.end_silence_samples = int(end_silence * sample_rate)
+        self.max_segment_samples = int(max_segment * sample_rate)
+        print(f"[WhisperRecognizer] Loading model: {model_size} (int8)")
+        self.model = _get_whisper_model(model_size)
+        self.reset()
+    
+    def process_audio(self, audio_data):
+        """
+        Add a chunk of audio and transcribe the utterance once it has ended.
+        
+        Args:
+            audio_data: Raw int16 audio bytes or memoryview from the microphone
+            
+        Returns:
+            Dictionary with 'text', 'partial' and 'result' keys, like VoskRecognizer
+        """
+        samples = np.frombuffer(audio_data, dtype=np.int16)
+        if samples.size == 0:
+            return _EMPTY_PARTIAL
+        rms = np.sqrt(np.mean(np.square(samples, dtype=np.float32)))
+        
+        if rms >= self.silence_threshold:
+            self._has_speech = True
+            self._silence_samples = 0
+        elif self._has_speech:
+            self._silence_samples += samples.size
+        else:
+            # Keep only the latest block before speech starts, as lead-in
+            self._segments = [samples.copy()]
+            self._segment_samples = samples.size
+            return _EMPTY_PARTIAL
+        
+        self._segments.append(samples.copy())  # The ring buffer view is reused after release
+        self._segment_samples += samples.size
+        if self._silence_samples >= self.end_silence_samples or self._segment_samples >= self.max_segment_samples:
+            return self._transcribe()
+        return _EMPTY_PARTIAL
+    
+    def _transcribe(self):
+        """Transcribe the collected utterance and start a new one."""
+        audio = np.concatenate(self._segments).astype(np.float32) * (1.0 / 32768.0)
+        self.reset()
+        segments, _ = self.model.transcribe(audio, language="en", vad_filter=True, beam_size=1)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        return {
+            'text': text,
+            'partial': False,
+            'result': {'text': text}
+        }
+    
+    def get_final_result(self):
+        """
+        Transcribe any speech collected so far.
+        
+        Returns:
+            Dictionary containing the final result
+        """
+        if self._has_speech:
+            return self._transcribe()
+        self.reset()
+        return {'text': '', 'partial': False, 'result': {'text': ''}}
+    
+    def reset(self):
+        """
+        Discard collected audio and wait for a new utterance.
+        """
+        self._segments = []
+        self._segment_samples = 0
+        self._silence_samples = 0
+        self._has_speech = False
 
 
 class SpeechToText:
@@ -234,19 +464,26 @@ class SpeechToText:
     Provides simple methods for real-time speech-to-text conversion.
     """
     
-    def __init__(self, model_path: str, sample_rate: int = 16000):
+    def __init__(self, model_path: str, sample_rate: int = 16000, backend: Optional[str] = None):
         """
         Initialize the complete speech-to-text system.
         
         Args:
             model_path: Path to the Vosk model directory
             sample_rate: Audio sample rate in Hz (default: 16000)
+            backend: "vosk" or "whisper" (default: STT_BACKEND env var, else "vosk")
         """
         self.sample_rate = sample_rate
+        backend = backend or os.getenv("STT_BACKEND", "vosk")
         
         # Initialize separate components
         self.audio_capture = AudioCapture(sample_rate=sample_rate)
-        self.recognizer = VoskRecognizer(model_path=model_path, sample_rate=sample_rate)
+        if backend == "whisper":
+            self.recognizer = WhisperRecognizer(
+                model_size=os.getenv("WHISPER_MODEL", "small.en"), sample_rate=sample_rate
+            )
+        else:
+            self.recognizer = VoskRecognizer(model_path=model_path, sample_rate=sample_rate)
     
     def start_listening(self, callback=None, device=None):
         """
@@ -269,11 +506,14 @@ class SpeechToText:
         try:
             # Main processing loop
             while self.audio_capture.is_active():
-                # Get audio data from capture queue
-                audio_data = self.audio_capture.get_audio_data()
+                # Get a view of the captured audio; time out so a stopped stream ends the loop
+                audio_view = self.audio_capture.get_audio_view(timeout=0.1)
+                if audio_view is None:
+                    continue
                 
-                # Process audio through recognizer
-                result = self.recognizer.process_audio(audio_data)
+                # Process audio through recognizer, then free the ring buffer space
+                result = self.recognizer.process_audio(audio_view)
+                self.audio_capture.release_audio_view()
                 
                 # Handle the result
                 if result['text']:
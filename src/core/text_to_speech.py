@@ -1,70 +1,358 @@
 from elevenlabs import ElevenLabs
-from pydub import AudioSegment
 import sounddevice as sd
-import numpy as np
-import io
+import hashlib
 import os
+import queue
+import re
 import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Optional
 from dotenv import load_dotenv
+from core._clients import HTTP_CLIENT
 
 
 load_dotenv()
-client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
+client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"), httpx_client=HTTP_CLIENT)
 
-# Global flag to track if audio is playing
-_audio_playing = False
-_audio_lock = threading.Lock()
+VOICE_ID = "2EiwWnXFnvU5JabPnv8n"
+MODEL_ID = "eleven_flash_v2_5"  # Flash model for maximum speed
 
-def text_to_speech(text_input: str):
+# Playback format: 16-bit mono PCM, requested directly from ElevenLabs (no decoding)
+SAMPLE_RATE = 22050
+OUTPUT_FORMAT = f"pcm_{SAMPLE_RATE}"
+# 50ms of silence written ahead of each playback so the device does not clip the first syllable.
+# Allocated once; nothing is concatenated onto the audio itself.
+_PREROLL = bytes(int(0.05 * SAMPLE_RATE) * 2)
+
+# Output stream kept open for the whole process (see _get_output_stream)
+_output_stream: Optional[sd.RawOutputStream] = None
+_output_lock = threading.Lock()
+
+# Workers for text_to_speech() calls, reused across utterances instead of a new thread each.
+# Playback itself is still serialized by _output_lock.
+_tts_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts")
+
+# Set while any playback (text_to_speech call or SpeechStream) is in progress.
+# is_audio_playing() only reads the event; the count lock is taken at start/end of playback.
+_audio_playing_evt = threading.Event()
+_active_playbacks = 0
+_playbacks_lock = threading.Lock()
+
+# End of a sentence followed by whitespace: where streamed text is cut for synthesis
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Synthesized PCM, kept in a memory LRU. Fixed phrases (synthesized with persist=True) are
+# also written to disk; LLM responses stay in memory only since they may contain caller details.
+_AUDIO_CACHE_SIZE = 64
+_audio_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_audio_cache_lock = threading.Lock()
+TTS_CACHE_DIR = os.getenv("FORGE_TTS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "forge", "tts"))
+
+def _request_audio(text_input: str) -> Iterator[bytes]:
     """
-    Convert text to speech and play it asynchronously.
+    Start an ElevenLabs synthesis request.
 
     Args:
         text_input: The text to be converted to speech.
+
+    Returns:
+        Generator of 16-bit mono PCM chunks as they arrive over the network
     """
-    global _audio_playing
-    
-    # Stream audio from ElevenLabs
     audio_stream = client.text_to_speech.convert(
-        voice_id="2EiwWnXFnvU5JabPnv8n",
-        model_id="eleven_flash_v2_5",  # Flash model for maximum speed
+        voice_id=VOICE_ID,
+        model_id=MODEL_ID,
         text=text_input,
-        output_format="mp3_22050_32"  # Lower quality for faster streaming
+        output_format=OUTPUT_FORMAT
     )
+    return _whole_frames(audio_stream)
+
+def _whole_frames(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Re-chunk a byte stream so every chunk holds whole 16-bit samples.
+    Network chunks can split a sample, which the output stream would reject.
+
+    Args:
+        chunks: Raw PCM byte chunks of arbitrary length
+
+    Returns:
+        Generator of even-length PCM chunks
+    """
+    carry = b""
+    for chunk in chunks:
+        if carry:
+            chunk = carry + chunk
+        if len(chunk) % 2:
+            chunk, carry = chunk[:-1], chunk[-1:]
+        else:
+            carry = b""
+        if chunk:
+            yield chunk
+
+def _get_output_stream() -> sd.RawOutputStream:
+    """
+    Get the process-wide output stream, opening and starting it on first use.
+    Keeping it open avoids a device open/close (tens to hundreds of ms) per utterance.
+
+    Returns:
+        Started 16-bit mono RawOutputStream at SAMPLE_RATE
+    """
+    global _output_stream
+    if _output_stream is None:
+        _output_stream = sd.RawOutputStream(samplerate=SAMPLE_RATE, channels=1, dtype='int16', latency='low')
+        _output_stream.start()
+    return _output_stream
+
+def _play_pcm(pcm_chunks: Iterable[bytes]):
+    """
+    Write PCM chunks to the sound card as they become available.
+    Returns once the last chunk has finished playing. Concurrent playbacks
+    are played one after another rather than mixed.
+
+    Args:
+        pcm_chunks: 16-bit mono PCM chunks at SAMPLE_RATE
+    """
+    global _output_stream
+    with _output_lock:
+        stream = _get_output_stream()
+        try:
+            stream.write(_PREROLL)
+            for chunk in pcm_chunks:
+                stream.write(chunk)
+        except Exception:
+            # Device errors (e.g. unplugged headset): reopen on the next playback
+            _output_stream = None
+            stream.close(ignore_errors=True)
+            raise
+        # write() returns once data is queued; wait for the device buffer to drain
+        time.sleep(stream.latency)
+
+def _audio_digest(text_input: str) -> str:
+    """Cache key for a phrase; changes whenever the voice, model or format changes."""
+    return hashlib.sha1(f"{VOICE_ID}|{MODEL_ID}|{SAMPLE_RATE}|{text_input}".encode("utf-8")).hexdigest()
+
+def _cache_audio(text_input: str, pcm: bytes, persist: bool = True):
+    """
+    Store synthesized audio in memory (LRU) and, for fixed phrases, on disk.
+
+    Args:
+        text_input: Phrase text
+        pcm: 16-bit mono PCM at SAMPLE_RATE
+        persist: Also write the audio to the disk cache
+    """
+    digest = _audio_digest(text_input)
+    with _audio_cache_lock:
+        _audio_cache[digest] = pcm
+        _audio_cache.move_to_end(digest)
+        if len(_audio_cache) > _AUDIO_CACHE_SIZE:
+            _audio_cache.popitem(last=False)
+    if not persist:
+        return
+    try:
+        os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+        path = os.path.join(TTS_CACHE_DIR, f"{digest}.raw")
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(pcm)
+        os.replace(f"{path}.tmp", path)  # Readers never see a partial file
+    except OSError as e:
+        print(f"[TTS] Could not write audio cache: {e}")
+
+def _cached_audio(text_input: str) -> Optional[bytes]:
+    """
+    Get synthesized audio from memory, falling back to the disk cache.
+
+    Args:
+        text_input: Phrase text
+
+    Returns:
+        PCM bytes, or None on a miss
+    """
+    digest = _audio_digest(text_input)
+    with _audio_cache_lock:
+        pcm = _audio_cache.get(digest)
+        if pcm is not None:
+            _audio_cache.move_to_end(digest)
+            return pcm
+    try:
+        with open(os.path.join(TTS_CACHE_DIR, f"{digest}.raw"), "rb") as f:
+            pcm = f.read()
+    except OSError:
+        return None
+    with _audio_cache_lock:
+        _audio_cache[digest] = pcm
+        if len(_audio_cache) > _AUDIO_CACHE_SIZE:
+            _audio_cache.popitem(last=False)
+    return pcm
+
+def prerender_audio(phrases: Dict[str, str]):
+    """
+    Synthesize fixed phrases once so later playback skips the TTS round-trip.
+    Phrases already in the disk cache are not synthesized again.
+
+    Args:
+        phrases: Mapping of cache key to phrase text (e.g. STATIC_AUDIO_HINTS)
+    """
+    rendered = 0
+    for cache_key, text in phrases.items():
+        if _cached_audio(text) is not None:
+            continue
+        try:
+            _cache_audio(text, b"".join(_request_audio(text)))
+            rendered += 1
+        except Exception as e:
+            print(f"[TTS] Failed to prerender '{cache_key}': {e}")
+    print(f"[TTS] Static phrases ready ({rendered} newly synthesized, {len(phrases) - rendered} cached)")
+
+def _playback_started():
+    """Count a new playback and raise the playing event."""
+    global _active_playbacks
+    with _playbacks_lock:
+        _active_playbacks += 1
+        _audio_playing_evt.set()
+
+def _playback_finished():
+    """Count a finished playback; clear the playing event when none are left."""
+    global _active_playbacks
+    with _playbacks_lock:
+        _active_playbacks -= 1
+        if _active_playbacks == 0:
+            _audio_playing_evt.clear()
+
+def synthesize(text_input: str, persist: bool = False) -> Iterator[bytes]:
+    """
+    Synthesize text without playing it, e.g. to send the audio to a browser.
+    Cached audio is returned as one chunk; otherwise chunks are yielded as they arrive
+    and the complete audio is cached once the generator is exhausted.
+
+    Args:
+        text_input: The text to be converted to speech.
+        persist: True for fixed phrases; their audio is also cached on disk
+            (see text_to_speech()).
+
+    Returns:
+        Generator of 16-bit mono PCM chunks at SAMPLE_RATE
+    """
+    pcm = _cached_audio(text_input)
+    if pcm is not None:
+        yield pcm
+        return
+
+    rendered = []
+    for chunk in _request_audio(text_input):
+        rendered.append(chunk)
+        yield chunk
+    _cache_audio(text_input, b"".join(rendered), persist=persist)
+
+def text_to_speech(text_input: str, persist: bool = False) -> threading.Event:
+    """
+    Convert text to speech and play it asynchronously.
+    Playback starts with the first received chunk, while the rest is still downloading.
+
+    Args:
+        text_input: The text to be converted to speech.
+        persist: True for fixed phrases (e.g. NLU results with an audio_cache_key);
+            their audio is also cached on disk. Generated responses are only
+            kept in memory, so verbatim re-prompts replay without a TTS call.
+
+    Returns:
+        Event set when this utterance has finished playing (or failed)
+    """
+    done = threading.Event()
+    # Mark playback as started before returning so is_audio_playing() polls never miss it
+    _playback_started()
 
-    # Combine all chunks from generator
-    audio_bytes = b"".join(audio_stream)
-
-    # Decode MP3 to AudioSegment
-    audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format="mp3")
-
-    # Convert to numpy array for sounddevice
-    samples = np.array(audio.get_array_of_samples())
-    
-    # If stereo, reshape
-    if audio.channels == 2:
-        samples = samples.reshape((-1, 2))
-    
-    # Normalize to float32
-    samples = samples.astype(np.float32) / (2**15)
-    
     def play_audio():
-        """Play audio in a separate thread"""
-        global _audio_playing
-        with _audio_lock:
-            _audio_playing = True
+        """Synthesize and play audio in a separate thread"""
         try:
-            sd.play(samples, audio.frame_rate, blocking=True)
-            sd.wait()  # Wait for playback to finish
+            _play_pcm(synthesize(text_input, persist))
+        except Exception as e:
+            print(f"[TTS] Playback failed: {e}")
         finally:
-            with _audio_lock:
-                _audio_playing = False
-    
-    # Start playback in background thread
-    thread = threading.Thread(target=play_audio, daemon=True)
-    thread.start()
+            _playback_finished()
+            done.set()
+
+    # Start playback on a pooled worker
+    _tts_pool.submit(play_audio)
+    return done
+
+class SpeechStream:
+    """
+    Speak text that arrives in pieces (e.g. streamed NLU output), one sentence at a time.
+    Each complete sentence is sent to ElevenLabs right away, so the first sentence plays
+    while the model is still generating the rest. A synthesis thread downloads audio
+    ahead into a queue and a playback thread writes it to one output stream.
+    """
+
+    def __init__(self, output: Optional[Callable[[Iterator[bytes]], None]] = None):
+        """
+        Start the synthesis and playback threads.
+
+        Args:
+            output: Receives the PCM chunks instead of the sound card (e.g. to send them
+                to a browser). Only local playback counts for is_audio_playing().
+        """
+        self.done = threading.Event()  # Set once everything fed has been played or sent
+        self._output = output
+        self._buffer = ""
+        self._sentences = queue.Queue()
+        self._pcm = queue.Queue()
+        if output is None:
+            _playback_started()
+        threading.Thread(target=self._synthesize, daemon=True).start()
+        threading.Thread(target=self._play, daemon=True).start()
+
+    def feed(self, text: str):
+        """
+        Add streamed text; complete sentences are queued for synthesis.
+        Never blocks, so it is safe to call from the NLU event loop.
+
+        Args:
+            text: Next piece of the response text
+        """
+        self._buffer += text
+        *sentences, self._buffer = _SENTENCE_END_RE.split(self._buffer)
+        for sentence in sentences:
+            self._sentences.put(sentence)
+
+    def close(self):
+        """Queue any remaining text and let playback finish."""
+        if self._buffer.strip():
+            self._sentences.put(self._buffer)
+        self._buffer = ""
+        self._sentences.put(None)
+
+    def _synthesize(self):
+        """Synthesis thread: turn queued sentences into PCM chunks."""
+        try:
+            while (sentence := self._sentences.get()) is not None:
+                for chunk in _request_audio(sentence):
+                    self._pcm.put(chunk)
+        except Exception as e:
+            print(f"[TTS] Streaming synthesis failed: {e}")
+        finally:
+            self._pcm.put(None)
+
+    def _play(self):
+        """Playback thread: write PCM chunks to the sound card (or output) in order."""
+        try:
+            first = self._pcm.get()
+            if first is not None:
+                (self._output or _play_pcm)(self._iter_pcm(first))
+        except Exception as e:
+            print(f"[TTS] Playback failed: {e}")
+        finally:
+            if self._output is None:
+                _playback_finished()
+            self.done.set()
+
+    def _iter_pcm(self, first: bytes) -> Iterator[bytes]:
+        """Yield queued PCM chunks until the synthesis thread is done."""
+        chunk = first
+        while chunk is not None:
+            yield chunk
+            chunk = self._pcm.get()
 
 def is_audio_playing() -> bool:
     """Check if audio is currently playing"""
-    with _audio_lock:
-        return _audio_playing 
\ No newline at end of file
+    return _audio_playing_evt.is_set()
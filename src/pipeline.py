@@ -10,15 +10,61 @@ Call ends when ConversationState is COMPLETE or EMERGENCY_TRANSFER.
 """
 
 from core.speech_to_text import SpeechToText
-from core.natural_language_understanding import ConversationalNLU, ConversationState
-from core.text_to_speech import text_to_speech, is_audio_playing
-from core.post_to_n8n import N8NWebhookClient
+from core.natural_language_understanding import ConversationalNLU, ConversationState, run_async, STATIC_AUDIO_HINTS
+from core.text_to_speech import text_to_speech, is_audio_playing, prerender_audio, SpeechStream
 import os
+import re
 import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Callback-choice answers, matched on whole words in one pass each
+AGENT_RE = re.compile(r"\b(?:agent|now|speak|talk|line|wait)\b", re.IGNORECASE)
+CALLBACK_RE = re.compile(r"\b(?:call ?back|later)\b", re.IGNORECASE)
+
+
+def create_n8n_client(webhook_url):
+    """
+    Create the n8n client, importing it (and requests) only when a webhook is configured.
+    
+    Args:
+        webhook_url: n8n webhook URL, or None
+        
+    Returns:
+        N8NWebhookClient, or None when no webhook is configured
+    """
+    if not webhook_url:
+        return None
+    from core.post_to_n8n import N8NWebhookClient
+    return N8NWebhookClient(webhook_url=webhook_url)
+
+
+def post_ticket_in_background(n8n_client, ticket):
+    """
+    Post a ticket to n8n on a separate thread so the call never waits on the webhook.
+    
+    Args:
+        n8n_client: N8NWebhookClient instance
+        ticket: Claim data dictionary
+        
+    Returns:
+        The started thread, to be joined before the process exits
+    """
+    def post():
+        try:
+            result = n8n_client.post_incident_from_dict(ticket)
+            print(f"[N8N] Ticket posted successfully: {result}")
+        except Exception as e:
+            print(f"[ERROR] Failed to post ticket to n8n: {e}")
+    
+    thread = threading.Thread(target=post, daemon=True)
+    thread.start()
+    return thread
+
 
 def run_call_handler():
     """
@@ -47,21 +93,27 @@ def run_call_handler():
     if not os.path.exists(model_path):
         model_path = "models/vosk-model-small-en-us-0.15"
     
-    if not os.path.exists(model_path):
+    if not os.path.exists(model_path) and os.getenv("STT_BACKEND", "vosk") != "whisper":
         print(f"[ERROR] Vosk model not found. Please download a model to the 'models' directory.")
         return
     
-    stt = SpeechToText(model_path=model_path)
-    nlu = ConversationalNLU()
-    
-    # Initialize n8n client if webhook URL is available
+    # Load the speech model, set up the NLU and prerender fixed phrases in parallel:
+    # each is mostly disk or network bound, so startup takes the longest of them, not the sum
     n8n_webhook_url = os.getenv("N8N_WEBHOOK_URL")
-    if n8n_webhook_url:
-        n8n_client = N8NWebhookClient(webhook_url=n8n_webhook_url)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        stt_future = executor.submit(SpeechToText, model_path=model_path)
+        nlu_future = executor.submit(ConversationalNLU)
+        n8n_future = executor.submit(create_n8n_client, n8n_webhook_url)
+        # Fixed phrases (greeting, transfers) are synthesized once and replayed from memory
+        executor.submit(prerender_audio, STATIC_AUDIO_HINTS)
+    stt = stt_future.result()
+    nlu = nlu_future.result()
+    n8n_client = n8n_future.result()
+    
+    if n8n_client:
         print("[SYSTEM] n8n webhook configured")
     else:
         print("[SYSTEM] N8N_WEBHOOK_URL not set - ticket posting disabled")
-        n8n_client = None
     
     # Start call with greeting
     print("\n[CALL START]")
@@ -70,7 +122,7 @@ def run_call_handler():
     print(f"[ASSISTANT] {greeting_text}")
     
     try:
-        text_to_speech(greeting_text)
+        text_to_speech(greeting_text, persist=True)
         # Wait until greeting finishes playing
         while is_audio_playing():
             time.sleep(0.1)  # Check every 100ms
@@ -82,6 +134,7 @@ def run_call_handler():
     
     # Track call state
     call_active = True
+    pending_posts = []  # n8n posts still in flight
     waiting_for_callback_choice = False  # Track if we're waiting for user's choice
     
     def handle_speech_callback(transcription_result):
@@ -106,29 +159,27 @@ def run_call_handler():
         
         # Special handling if waiting for callback choice
         if waiting_for_callback_choice:
-            user_lower = user_input.lower()
-            
             # Pause audio for response
             stt.audio_capture.stop_stream()
             
-            if any(word in user_lower for word in ['agent', 'now', 'speak', 'talk', 'line', 'wait']):
+            if AGENT_RE.search(user_input):
                 response = "I'm transferring you to an agent now. Please hold."
                 print(f"[ASSISTANT] {response}")
-                text_to_speech(response)
+                text_to_speech(response, persist=True)
                 while is_audio_playing():
                     time.sleep(0.1)
                 print("[SYSTEM] Transferring to agent...")
-            elif any(word in user_lower for word in ['call back', 'callback', 'later', 'back later']):
+            elif CALLBACK_RE.search(user_input):
                 response = "Perfect. We'll call you back later. Have a great day!"
                 print(f"[ASSISTANT] {response}")
-                text_to_speech(response)
+                text_to_speech(response, persist=True)
                 while is_audio_playing():
                     time.sleep(0.1)
                 print("[SYSTEM] Callback scheduled")
             else:
                 response = "I'm sorry, I didn't understand. Would you like to speak with an agent now, or be called back later?"
                 print(f"[ASSISTANT] {response}")
-                text_to_speech(response)
+                text_to_speech(response, persist=True)
                 while is_audio_playing():
                     time.sleep(0.1)
                 stt.audio_capture.start_stream()
@@ -138,9 +189,22 @@ def run_call_handler():
             stt.stop_listening()
             return
         
+        async def process_turn(text, speech):
+            # Release the microphone while the model is thinking; the response is spoken
+            # sentence by sentence while it is still being generated
+            nlu_result, _ = await asyncio.gather(
+                nlu.process_input_async(text, on_response_delta=speech.feed),
+                asyncio.to_thread(stt.audio_capture.stop_stream)
+            )
+            return nlu_result
+        
         try:
             # Process through NLU
-            nlu_result = nlu.process_input(user_input)
+            speech = SpeechStream()
+            try:
+                nlu_result = run_async(process_turn(user_input, speech))
+            finally:
+                speech.close()
             
             response_text = nlu_result['response']
             current_state = nlu_result['state']
@@ -160,7 +224,9 @@ def run_call_handler():
                 # Pause audio capture while assistant is speaking
                 stt.audio_capture.stop_stream()
                 
-                text_to_speech(response_text)
+                # Streamed responses are already playing; anything else is spoken now
+                if not nlu_result['response_streamed']:
+                    text_to_speech(response_text, persist='audio_cache_key' in nlu_result)
                 # Wait until audio finishes playing
                 while is_audio_playing():
                     time.sleep(0.1)  # Check every 100ms
@@ -183,13 +249,9 @@ def run_call_handler():
                 print(f"[SYSTEM] Call would be transferred to agent")
                 print(f"[SYSTEM] Collected data: {nlu_result['claim_data']}")
                 ticket = nlu_result['claim_data']                    
-                # Post to n8n if available
+                # Post to n8n if available (in the background)
                 if n8n_client:
-                    try:
-                        result = n8n_client.post_incident_from_dict(ticket)
-                        print(f"[N8N] Ticket posted successfully: {result}")
-                    except Exception as e:
-                        print(f"[ERROR] Failed to post ticket to n8n: {e}")
+                    pending_posts.append(post_ticket_in_background(n8n_client, ticket))
                     
                 call_active = False
                 stt.stop_listening()
@@ -206,13 +268,9 @@ def run_call_handler():
                     ticket = nlu_result['claim_data']
                     print(f"\n[TICKET] {ticket}")
                     
-                    # Post to n8n if available
+                    # Post to n8n if available, without delaying the caller's next answer
                     if n8n_client:
-                        try:
-                            result = n8n_client.post_incident_from_dict(ticket)
-                            print(f"[N8N] Ticket posted successfully: {result}")
-                        except Exception as e:
-                            print(f"[ERROR] Failed to post ticket to n8n: {e}")
+                        pending_posts.append(post_ticket_in_background(n8n_client, ticket))
                     
                 except Exception as e:
                     print(f"[ERROR] Failed to create ticket: {e}")
@@ -231,9 +289,9 @@ def run_call_handler():
             
             # Try to say error message
             try:
-                error_msg = "I apologize, I'm having technical difficulties. Let me connect you with an agent."
+                error_msg = STATIC_AUDIO_HINTS["tech_error"]
                 print(f"[ASSISTANT] {error_msg}")
-                text_to_speech(error_msg)
+                text_to_speech(error_msg, persist=True)
                 # Wait until audio finishes playing
                 while is_audio_playing():
                     time.sleep(0.1)  # Check every 100ms
@@ -253,6 +311,11 @@ def run_call_handler():
         import traceback
         traceback.print_exc()
     finally:
+        # Let in-flight ticket posts finish before exiting
+        for thread in pending_posts:
+            thread.join(timeout=n8n_client.timeout if n8n_client else None)
+        # Post-call enrichment goes to the Batch API, after the caller is gone
+        nlu.flush_postcall_jobs()
         print("\n" + "=" * 60)
         print("FORGe Call Handler - Stopped")
         print("=" * 60 + "\n")
@@ -0,0 +1,194 @@
+"""
+Tests for the streamed "response" field decoder and the decision whether the
+streamed text is spoken unchanged.
+Run with: python -m pytest src/test/test_response_streamer.py
+"""
+
+import sys
+import os
+
+import orjson
+
+# Add src to path to import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+os.environ.setdefault("OPENAI_API_KEY", "test")  # Client is constructed but never called
+
+from core.natural_language_understanding import (
+    ConversationalNLU, ClaimExtraction, NLUTurn, _ResponseFieldStreamer
+)
+
+
+def _turn_json(response, claim=None, **overrides):
+    """Serialize a model turn as the API sends it: NLUTurn fields in schema order."""
+    extraction = dict.fromkeys(ClaimExtraction.model_fields)
+    extraction.update(claim or {"policyId": "AC-12345"})
+    turn = {
+        "emergency_detected": False,
+        "emergency_reason": "",
+        "frustration_score": 1.0,
+        "claim_data": ClaimExtraction(**extraction),
+        "conversation_state": "GATHERING_INCIDENT_DETAILS",
+        "response": response,
+    }
+    turn.update(overrides)
+    return NLUTurn(**turn).model_dump_json()
+
+
+def _feed_split(raw, sizes):
+    """Feed raw JSON in chunks of the given sizes (the rest in one piece)."""
+    streamer = _ResponseFieldStreamer()
+    pieces = []
+    pos = 0
+    for size in sizes:
+        pieces.append(streamer.feed(raw[pos:pos + size]))
+        pos += size
+    pieces.append(streamer.feed(raw[pos:]))
+    return streamer, pieces
+
+
+def _feed_every_split(raw, expected):
+    """Split the raw JSON at every position and check the decoded text."""
+    assert orjson.loads(raw)["response"] == expected
+    for cut in range(len(raw) + 1):
+        streamer, pieces = _feed_split(raw, [cut])
+        assert "".join(pieces) == expected, f"split at {cut}"
+        assert streamer.text == expected
+
+
+def _nlu(**claim):
+    nlu = ConversationalNLU()
+    for key, value in claim.items():
+        setattr(nlu.claim_data, key, value)
+    return nlu
+
+
+# ---------------------------------------------------------------------------
+# _ResponseFieldStreamer
+# ---------------------------------------------------------------------------
+
+def test_plain_response_streamed_char_by_char():
+    raw = _turn_json("Where did it happen?")
+    streamer, pieces = _feed_split(raw, [1] * len(raw))
+    assert "".join(pieces) == "Where did it happen?"
+    assert streamer.text == orjson.loads(raw)["response"]
+
+
+def test_split_quote_escape():
+    text = 'You said "the garage", right?'
+    raw = _turn_json(text)
+    assert '\\"' in raw
+    _feed_every_split(raw, text)
+
+
+def test_split_backslash_and_control_escapes():
+    text = "Line one\nC:\\claims\tdone"
+    _feed_every_split(_turn_json(text), text)
+
+
+def test_split_unicode_escape():
+    # The API may send non-ASCII characters as \uXXXX escapes
+    text = "Caf\u00e9 on the Stra\u00dfe"
+    raw = _turn_json(text).replace("\u00e9", "\\u00e9").replace("\u00df", "\\u00df")
+    assert "\\u00e9" in raw
+    _feed_every_split(raw, text)
+
+
+def test_split_surrogate_pair():
+    text = "Thanks \U0001F697 we'll sort it out"
+    raw = _turn_json(text).replace("\U0001F697", "\\ud83d\\ude97")
+    assert "\\ud83d\\ude97" in raw
+    _feed_every_split(raw, text)
+
+
+def test_lone_high_surrogate_is_kept():
+    streamer, pieces = _feed_split('{"response":"a\\ud83dbc"}', [18])
+    assert "".join(pieces) == "a\ud83dbc"
+
+
+def test_text_before_response_key_is_not_streamed():
+    raw = _turn_json("Got it.", emergency_reason='the "response" was fine')
+    streamer, pieces = _feed_split(raw, [10, 10])
+    assert "".join(pieces) == "Got it."
+
+
+def test_decoding_stops_at_closing_quote():
+    raw = _turn_json("Okay.")
+    streamer = _ResponseFieldStreamer()
+    assert streamer.feed(raw[:-1]) == "Okay."
+    assert streamer.feed(raw[-1:]) == ""
+    assert streamer.text == "Okay."
+
+
+def test_parse_prefix_has_every_field_but_response():
+    # The streamer relies on "response" being the last field of NLUTurn
+    raw = _turn_json("Okay.", frustration_score=2.5)
+    streamer = _ResponseFieldStreamer()
+    streamer.feed(raw[:raw.index('"response"') + 14])
+    prefix = streamer.parse_prefix()
+    assert set(prefix) == set(NLUTurn.model_fields) - {"response"}
+    assert prefix["frustration_score"] == 2.5
+    assert prefix["claim_data"]["policyId"] == "AC-12345"
+
+
+def test_parse_prefix_unparseable():
+    streamer = _ResponseFieldStreamer()
+    streamer.feed('{"emergency_detected":fal, "response":"Hi')
+    assert streamer.parse_prefix() is None
+
+
+# ---------------------------------------------------------------------------
+# ConversationalNLU._response_is_final
+# ---------------------------------------------------------------------------
+
+def _partial(**overrides):
+    """Fields preceding "response", as parse_prefix() returns them for a streamed turn."""
+    streamer = _ResponseFieldStreamer()
+    streamer.feed(_turn_json("x", **overrides))
+    return streamer.parse_prefix()
+
+
+def test_final_while_gathering():
+    assert _nlu()._response_is_final(_partial()) is True
+
+
+def test_not_final_without_prefix():
+    nlu = _nlu()
+    assert nlu._response_is_final(None) is False
+    assert nlu._response_is_final({}) is False
+
+
+def test_not_final_on_emergency_transfer():
+    assert _nlu()._response_is_final(_partial(emergency_detected=True)) is False
+
+
+def test_not_final_on_frustration_transfer():
+    nlu = _nlu()
+    assert nlu._response_is_final(_partial(frustration_score=5.0)) is True
+    assert nlu._response_is_final(_partial(frustration_score=7.5)) is False
+
+
+def test_not_final_on_missing_fields():
+    partial = _partial()
+    del partial["conversation_state"]
+    assert _nlu()._response_is_final(partial) is False
+
+
+def test_not_final_when_claim_becomes_complete():
+    # The turn that completes the claim is replaced by the confirmation summary
+    nlu = _nlu(policyId="AC-12345", customerName="Jane Doe", incidentType="Vehicle Accident",
+               description="Rear-ended at a light")
+    assert nlu._response_is_final(_partial()) is True
+    assert nlu._response_is_final(_partial(claim={"location": "Main Street"})) is False
+
+
+def test_null_fields_do_not_complete_claim():
+    nlu = _nlu(policyId="AC-12345", customerName="Jane Doe", incidentType="Vehicle Accident",
+               description="Rear-ended at a light")
+    assert nlu._response_is_final(_partial(claim={"location": "null"})) is True
+
+
+def test_final_in_complete_state():
+    nlu = _nlu(policyId="AC-12345", customerName="Jane Doe", incidentType="Vehicle Accident",
+               description="Rear-ended at a light", location="Main Street")
+    assert nlu._response_is_final(_partial(conversation_state="CONFIRMING")) is False
+    assert nlu._response_is_final(_partial(conversation_state="COMPLETE")) is True
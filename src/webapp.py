@@ -5,15 +5,19 @@ Reuses pipeline.py logic through a callback system.
 
 from flask import Flask, render_template
 from flask_socketio import SocketIO, emit
-import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
 
 # Import everything from pipeline - we'll reuse the logic
-from core.natural_language_understanding import ConversationalNLU
-from core.text_to_speech import text_to_speech, is_audio_playing
-from core.post_to_n8n import N8NWebhookClient
+from core.natural_language_understanding import ConversationalNLU, STATIC_AUDIO_HINTS
+from core.text_to_speech import synthesize, prerender_audio, SpeechStream, SAMPLE_RATE
 import os
-import time
+import re
 
 load_dotenv()
 
@@ -21,10 +25,40 @@ app = Flask(__name__, template_folder='demo/templates')
 app.config['SECRET_KEY'] = 'forge-demo-secret'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+# Call logging goes through a queue; a listener thread does the console I/O, so socket
+# handlers never block on stdout. Arguments are only formatted for enabled levels.
+log = logging.getLogger("forge.web")
+log.setLevel(logging.INFO)
+log.propagate = False
+_log_queue = queue.SimpleQueue()
+log.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Flush queued lines on exit
+
+# Fixed lines of the callback-choice step, keyed by TTS cache key.
+# Synthesized once at startup so these branches play without a TTS round-trip.
+FIXED_PHRASES = {
+    "transfer_agent": "Transferring you to an agent now. Please hold.",
+    "callback_scheduled": "Got it! We'll call you back within 24 hours. Have a great day!",
+    "callback_unclear": "I didn't catch that. Would you like to speak with an agent now, or should we call you back later?",
+}
+
+# Callback-choice answers, matched on whole words in one pass each
+AGENT_RE = re.compile(r"\b(?:agent|now|speak|yes|human)\b", re.IGNORECASE)
+CALLBACK_RE = re.compile(r"\b(?:call ?back|later|no)\b", re.IGNORECASE)
+
+# Workers that synthesize utterances and stream them to the browser
+_audio_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="audio")
+# Worker for n8n ticket posts, so the webhook round-trip never holds up the call
+_io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="n8n")
+
 # Override the callback mechanism
 class WebCallHandler:
     def __init__(self):
-        self.nlu = None
+        # One NLU for the server's lifetime, reset between calls (which also empties its
+        # response cache). Clients and system prompt are built once instead of on every call.
+        self.nlu = ConversationalNLU()
         self.n8n_client = None
         self.call_active = False
         self.waiting_for_callback_choice = False
@@ -34,93 +68,112 @@ class WebCallHandler:
         self.call_active = True
         self.waiting_for_callback_choice = False
         
-        # Initialize (same as pipeline.py)
-        self.nlu = ConversationalNLU()
+        # Initialize (same as pipeline.py); reset() also submits the last call's post-call jobs
+        self.nlu.reset()
         
+        # Kept across calls so ticket posts reuse the client's open connection
         n8n_webhook_url = os.getenv("N8N_WEBHOOK_URL")
-        if n8n_webhook_url:
+        if n8n_webhook_url and self.n8n_client is None:
+            # Imported here: requests is only needed when a webhook is configured
+            from core.post_to_n8n import N8NWebhookClient
             self.n8n_client = N8NWebhookClient(webhook_url=n8n_webhook_url)
         
         # Greeting
         greeting = self.nlu.get_greeting()
-        print(f"[ASSISTANT] {greeting}")
-        
-        socketio.emit('assistant_message', {'text': greeting, 'frustration': 0})
-        socketio.emit('claim_update', {'data': self.nlu.claim_data})
+        log.info("[ASSISTANT] %s", greeting)
         
-        threading.Thread(target=self._play_and_listen, args=(greeting,), daemon=True).start()
+        self._speak(greeting, persist=True)
+        self._emit_batch([
+            ('assistant_message', {'text': greeting, 'frustration': 0}),
+            ('claim_update', {'data': self.nlu.claim_data.to_dict()})
+        ])
     
     def handle_speech(self, user_text):
         """Handle user speech - FULL implementation from pipeline.py"""
         if not self.call_active or not user_text:
             return
         
-        print(f"[USER] {user_text}")
+        log.info("[USER] %s", user_text)
         socketio.emit('user_message', {'text': user_text})
         
         try:
             # Check if waiting for callback choice
             if self.waiting_for_callback_choice:
-                user_lower = user_text.lower()
-                
-                if any(word in user_lower for word in ['agent', 'now', 'speak', 'yes', 'human']):
-                    response = "Transferring you to an agent now. Please hold."
-                    print(f"[ASSISTANT] {response}")
-                    socketio.emit('assistant_message', {'text': response, 'frustration': 0})
+                if AGENT_RE.search(user_text):
+                    response = FIXED_PHRASES["transfer_agent"]
+                    log.info("[ASSISTANT] %s", response)
                     
-                    text_to_speech(response)
-                    while is_audio_playing():
-                        time.sleep(0.1)
+                    self._speak(response, persist=True)
+                    socketio.emit('assistant_message', {'text': response, 'frustration': 0})
                     
+                    # The browser keeps playing the goodbye after the call has ended
                     socketio.emit('call_ended', {'reason': 'transfer', 'message': 'Transferred to agent'})
                     self.call_active = False
                     self.waiting_for_callback_choice = False
                     return
                     
-                elif any(word in user_lower for word in ['call back', 'callback', 'later', 'no']):
-                    response = "Got it! We'll call you back within 24 hours. Have a great day!"
-                    print(f"[ASSISTANT] {response}")
-                    socketio.emit('assistant_message', {'text': response, 'frustration': 0})
+                elif CALLBACK_RE.search(user_text):
+                    response = FIXED_PHRASES["callback_scheduled"]
+                    log.info("[ASSISTANT] %s", response)
                     
-                    text_to_speech(response)
-                    while is_audio_playing():
-                        time.sleep(0.1)
+                    self._speak(response, persist=True)
+                    socketio.emit('assistant_message', {'text': response, 'frustration': 0})
                     
                     socketio.emit('call_ended', {'reason': 'complete', 'message': 'Callback scheduled'})
                     self.call_active = False
                     self.waiting_for_callback_choice = False
                     return
                 else:
-                    response = "I didn't catch that. Would you like to speak with an agent now, or should we call you back later?"
-                    print(f"[ASSISTANT] {response}")
+                    response = FIXED_PHRASES["callback_unclear"]
+                    log.info("[ASSISTANT] %s", response)
+                    self._speak(response, persist=True)
                     socketio.emit('assistant_message', {'text': response, 'frustration': 0})
-                    threading.Thread(target=self._play_and_listen, args=(response,), daemon=True).start()
                     return
             
-            # Normal NLU processing
-            nlu_result = self.nlu.process_input(user_text)
+            # Normal NLU processing. The response is shown and spoken sentence by
+            # sentence while the model is still generating it.
+            speech = SpeechStream(output=self._emit_audio)
+            
+            def on_response_delta(text):
+                speech.feed(text)
+                socketio.emit('assistant_delta', {'text': text})
+            
+            try:
+                nlu_result = self.nlu.process_input(user_text, on_response_delta=on_response_delta)
+            finally:
+                speech.close()
             response = nlu_result['response']
             
-            print(f"[ASSISTANT] {response}")
+            log.info("[ASSISTANT] %s", response)
+            
+            should_transfer = nlu_result.get('should_transfer', False)
+            is_complete = nlu_result.get('is_complete', False)
             
-            socketio.emit('assistant_message', {
-                'text': response,
-                'frustration': nlu_result.get('frustration_score', 0)
-            })
-            socketio.emit('claim_update', {'data': nlu_result['claim_data']})
+            # Streamed responses are already being sent; anything else starts before the UI update
+            if nlu_result['response_streamed']:
+                _audio_pool.submit(self._end_audio_after, speech)
+            else:
+                self._speak(response, persist='audio_cache_key' in nlu_result)
+            if not should_transfer:
+                # Callback choice is asked at the end of the completion message
+                self.waiting_for_callback_choice = is_complete
+            
+            # UI updates for this turn go out as one socket message
+            turn_events = [
+                ('assistant_message', {
+                    'text': response,
+                    'frustration': nlu_result.get('frustration_score', 0)
+                }),
+                ('claim_update', {'data': nlu_result['claim_data']})
+            ]
+            if is_complete and not should_transfer:
+                turn_events.append(('call_complete', {'data': nlu_result['claim_data']}))
+            self._emit_batch(turn_events)
             
             # Check if should transfer
-            if nlu_result.get('should_transfer', False):
-                text_to_speech(response)
-                while is_audio_playing():
-                    time.sleep(0.1)
-                
+            if should_transfer:
                 if self.n8n_client:
-                    try:
-                        result = self.n8n_client.post_incident_from_dict(nlu_result['claim_data'])
-                        print(f"[N8N] Ticket posted: {result}")
-                    except Exception as e:
-                        print(f"[ERROR] n8n post failed: {e}")
+                    self._post_ticket(nlu_result['claim_data'])
                 
                 socketio.emit('call_ended', {
                     'reason': 'transfer',
@@ -130,43 +183,87 @@ class WebCallHandler:
                 return
             
             # Check if complete
-            if nlu_result.get('is_complete', False):
-                print("[CALL] Claim complete!")
+            if is_complete:
+                log.info("[CALL] Claim complete!")
                 
                 # Post to n8n
                 if self.n8n_client:
-                    try:
-                        result = self.n8n_client.post_incident_from_dict(nlu_result['claim_data'])
-                        print(f"[N8N] Ticket posted: {result}")
-                        socketio.emit('ticket_posted', {'result': result})
-                    except Exception as e:
-                        print(f"[ERROR] n8n post failed: {e}")
-                
-                socketio.emit('call_complete', {'data': nlu_result['claim_data']})
-                
-                # Set flag and continue listening
-                self.waiting_for_callback_choice = True
-                threading.Thread(target=self._play_and_listen, args=(response,), daemon=True).start()
-                return
-            
-            # Continue conversation
-            threading.Thread(target=self._play_and_listen, args=(response,), daemon=True).start()
+                    self._post_ticket(nlu_result['claim_data'])
             
         except Exception as e:
-            print(f'[ERROR] Processing error: {e}')
-            import traceback
-            traceback.print_exc()
+            log.exception("[ERROR] Processing error: %s", e)
             socketio.emit('error', {'message': str(e)})
     
-    def _play_and_listen(self, text):
-        text_to_speech(text)
-        while is_audio_playing():
-            time.sleep(0.1)
-        socketio.emit('ready_to_listen')
+    def _post_ticket(self, claim_data):
+        """
+        Post the claim to n8n in the background; 'ticket_posted' is emitted once it is done.
+        
+        Args:
+            claim_data: Claim data dictionary from the NLU
+        """
+        future = _io_pool.submit(self.n8n_client.post_incident_from_dict, claim_data)
+        future.add_done_callback(self._on_ticket_posted)
+    
+    def _on_ticket_posted(self, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            log.error("[ERROR] n8n post failed: %s", e)
+            socketio.emit('error', {'message': f'n8n post failed: {e}'})
+            return
+        log.info("[N8N] Ticket posted: %s", result)
+        socketio.emit('ticket_posted', {'result': result})
+    
+    def _emit_batch(self, events):
+        """
+        Send several UI events as a single 'turn_update' socket message.
+        The browser dispatches each one to its regular handler.
+        
+        Args:
+            events: List of (event_name, payload) pairs, in order
+        """
+        socketio.emit('turn_update', {'events': [{'name': name, 'data': data} for name, data in events]})
+    
+    def _speak(self, text, persist=False):
+        """
+        Synthesize an utterance and stream it to the browser, which plays it and answers
+        with 'tts_done'. Returns immediately, so callers can update the UI while audio
+        is synthesized.
+        
+        Args:
+            text: Assistant text to speak
+            persist: True for fixed phrases, whose audio is also cached on disk
+        """
+        _audio_pool.submit(self._send_audio, synthesize(text, persist))
+    
+    def _send_audio(self, pcm_chunks):
+        # One utterance: its audio chunks, then 'tts_end' even if synthesis failed
+        try:
+            self._emit_audio(pcm_chunks)
+        except Exception as e:
+            log.error("[TTS] Synthesis failed: %s", e)
+        finally:
+            socketio.emit('tts_end')
+    
+    def _emit_audio(self, pcm_chunks):
+        # Raw 16-bit mono PCM goes out as binary attachments; the browser plays it as is
+        for chunk in pcm_chunks:
+            socketio.emit('tts_audio', {'pcm': chunk, 'rate': SAMPLE_RATE})
+    
+    def _end_audio_after(self, speech):
+        # A streamed response ends once its SpeechStream has sent everything
+        speech.done.wait()
+        socketio.emit('tts_end')
+    
+    def audio_finished(self):
+        """The browser finished playing an utterance: hand the turn back to the caller."""
+        if self.call_active:
+            socketio.emit('ready_to_listen')
     
     def end_call(self):
         self.call_active = False
-        print('[WEB] Call ended by user')
+        log.info("[WEB] Call ended by user")
+        self.nlu.flush_postcall_jobs(wait=False)
 
 # Global handler
 handler = WebCallHandler()
@@ -177,7 +274,7 @@ def index():
 
 @socketio.on('connect')
 def handle_connect():
-    print('[WEB] Client connected')
+    log.info("[WEB] Client connected")
 
 @socketio.on('start_call')
 def handle_start_call():
@@ -189,6 +286,10 @@ def handle_user_speech(data):
     if text:
         handler.handle_speech(text)
 
+@socketio.on('tts_done')
+def handle_tts_done():
+    handler.audio_finished()
+
 @socketio.on('end_call')
 def handle_end_call():
     handler.end_call()
@@ -200,4 +301,9 @@ if __name__ == '__main__':
     print('=' * 60)
     print('\nOpen in browser: http://localhost:5000')
     print('Or from phone on same network: http://<your-ip>:5000\n')
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    handler.nlu.warm_up()
+    prerender_audio({**STATIC_AUDIO_HINTS, **FIXED_PHRASES})
+    # Debugger and reloader only on request (FORGE_DEBUG=1); the reloader would also restart
+    # the process and repeat the warm-up above
+    debug = os.getenv('FORGE_DEBUG') == '1'
+    socketio.run(app, host='0.0.0.0', port=5000, debug=debug, use_reloader=debug, allow_unsafe_werkzeug=True)
\ No newline at end of file